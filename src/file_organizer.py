@@ -1,13 +1,57 @@
 import os
+import sys
 import shutil
 import hashlib
-import tkinter as tk
-from tkinter import filedialog, messagebox
-from tkinter import ttk
+import mmap
 from datetime import datetime
 import argparse
+import logging
 import tarfile
-import configparser
+import json
+import filecmp
+import sqlite3
+import itertools
+import functools
+import stat
+import queue
+import time
+import threading
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+
+# Optional: BLAKE3 is much faster than SHA256 for duplicate detection
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+# Optional: xxHash is used for the cheap "sketch" pre-hash when installed, and for
+# duplicate detection when BLAKE3 isn't
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Optional: pyzstd enables multi-threaded Zstandard (.tar.zst) archives
+try:
+    import pyzstd
+except ImportError:
+    pyzstd = None
+
+# Unix only: owner and group names recorded in archive members
+try:
+    import pwd
+    import grp
+except ImportError:
+    pwd = grp = None
+
+# Optional (Windows, pywin32): CopyFile uses the OS's own fast copy path
+try:
+    import win32file
+except ImportError:
+    win32file = None
 
 # --- Configuration ---
 DUPLICATES_FOLDER_NAME = "duplicates"
@@ -15,15 +59,81 @@ NO_EXTENSION_FOLDER_NAME = "_no_extension_"
 HIDDEN_OR_CONFIG_FOLDER_NAME = "_hidden_or_config_"
 OTHER_FOLDER_NAME = "other"
 
-# Global flag for verbose mode, set by command-line arguments
+# Global flag for verbose mode, set by command-line arguments.
+# Verbose messages go to `logger` at DEBUG level; checking this flag first keeps
+# their (often expensive) formatting out of the hot loop when it is off.
 VERBOSE_MODE = False
 
+logger = logging.getLogger("file_organizer")
+
 # Configuration file for remembering last paths
-CONFIG_FILE_NAME = ".file_organizer_config.ini"
-CONFIG_SECTION = "Paths"
+CONFIG_FILE_NAME = ".file_organizer_config.json"
+# Older versions kept the last paths in an INI file; it is still read if no JSON config exists yet
+LEGACY_CONFIG_FILE_NAME = ".file_organizer_config.ini"
+CONFIG_SECTION = "Paths" # Section of the legacy INI file
 CONFIG_SOURCE_KEY = "last_source_folder"
 CONFIG_DEST_KEY = "last_destination_folder"
 
+# SQLite database (in the user's home directory) remembering file hashes across runs
+HASH_CACHE_FILE_NAME = ".file_organizer_hashcache.db"
+
+# Hash algorithm used for duplicate detection: "blake3", an xxHash algorithm (if
+# installed) or any name accepted by hashlib.new. The default is the fastest one
+# installed; it can be overridden with the FILEORG_HASH environment variable (any case,
+# checked by hash_algo_error).
+XXHASH_ALGOS = frozenset(("xxh32", "xxh64", "xxh3_64", "xxh3_128"))
+HASH_ALGO = os.environ.get("FILEORG_HASH", "blake3" if blake3 else "xxh3_128" if xxhash else "sha256").lower()
+
+# BLAKE3 only hashes a file on multiple threads when it is larger than this
+BLAKE3_THREADED_MIN_SIZE = 1024 * 1024
+
+# Files larger than this are memory-mapped for hashing; for smaller ones setting up
+# the mapping costs more than the copy it saves
+MMAP_MIN_SIZE = 1024 * 1024
+# Mapped files are hashed this much at a time, and each slice's pages are released
+# afterwards, so hashing a huge file doesn't grow the resident set by its whole size
+MMAP_SLICE_SIZE = 256 * 1024 * 1024
+
+# Read size of the hashing loop used before Python 3.11 (no hashlib.file_digest);
+# large reads keep the per-call interpreter overhead small next to the hashing itself
+HASH_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Number of bytes read from the start, the middle and the end of a file for its quick sketch
+SKETCH_BLOCK_SIZE = 4096
+# Files sketched per thread pool task: enough to amortize the task overhead, few enough
+# that every hashing thread keeps a read in flight
+SKETCH_BATCH_SIZE = 64
+
+# Use 1 MiB chunks when shutil has to copy through a read/write loop (the default is
+# 64 KiB outside Windows); zero-copy paths like sendfile are unaffected.
+shutil.COPY_BUFSIZE = max(shutil.COPY_BUFSIZE, 1024 * 1024)
+
+# Hashing threads (hashlib releases the GIL, so one per CPU), and how many files
+# ahead of the copy loop they may run
+HASH_WORKERS = os.cpu_count() or 4
+HASH_LOOKAHEAD = 64
+
+# Threads walking top-level sub-directories in scan_folder_parallel. The walk waits on
+# metadata round trips rather than the CPU, so this doesn't follow the CPU count.
+SCAN_WORKERS = 8
+
+# How often (in ms) the GUI redraws the progress reported by the worker thread
+PROGRESS_POLL_MS = 50
+
+# organize_files_in_folder reports progress once 1/PROGRESS_STEPS of the files or this
+# many seconds have gone by since its last report (and always for the last file)
+PROGRESS_MIN_INTERVAL = 0.05
+PROGRESS_STEPS = 500
+
+# Tkinter is only imported (by load_tkinter) when the GUI is actually started, so
+# command-line runs neither pay for it nor need it installed.
+tk = filedialog = messagebox = ttk = None
+
+# Whether a GUI can be shown at all. Windows and macOS always have a display; elsewhere
+# Tk needs an X display (VS Code's terminal may forward one without setting DISPLAY).
+_HAS_DISPLAY = (os.name == "nt" or sys.platform == "darwin" or "DISPLAY" in os.environ
+                or os.getenv("TERM_PROGRAM") == "vscode")
+
 # --- File Type Grouping ---
 FILE_TYPE_GROUPS = {
     "images": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".webp", ".ico", ".svg"],
@@ -35,64 +145,232 @@ FILE_TYPE_GROUPS = {
     "code": [".py", ".js", ".html", ".css", ".java", ".c", ".cpp", ".h", ".cs", ".php", ".rb", ".go", ".swift", ".kt", ".ts", ".jsx", ".tsx", ".vue", ".json", ".xml", ".yml", ".yaml", ".toml", ".ini", ".cfg"],
 }
 
+# Inverted FILE_TYPE_GROUPS: Key: ".ext", Value: (group_name, "ext").
+# Extensions listed in several groups keep the first group, as the linear scan did.
+_EXT_LOOKUP = {}
+for _group_name, _extensions in FILE_TYPE_GROUPS.items():
+    for _ext in _extensions:
+        _EXT_LOOKUP.setdefault(_ext, (_group_name, _ext[1:]))
+del _group_name, _extensions, _ext
+
+# --- Lazy GUI Import ---
+def load_tkinter():
+    """Imports Tkinter into the module globals used by the GUI classes. Raises ImportError if it is missing."""
+    global tk, filedialog, messagebox, ttk
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, ttk
+
+# --- Logging ---
+def _safe(text):
+    """
+    Returns text (usually a path) safe to print or log: characters that can't be encoded
+    as UTF-8, such as the surrogates os uses for undecodable file names, become '?'.
+    Only call it while actually building a message, never on the fast path.
+    """
+    if text.isascii(): # The common case: nothing to replace, no copies made
+        return text
+    return text.encode('utf-8', errors='replace').decode('utf-8')
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """
+    StreamHandler that leaves flushing to the stream's own buffering.
+    logging.StreamHandler flushes after every record, i.e. one write() syscall per
+    message; when output is redirected to a file or pipe that adds up quickly.
+    """
+    def flush(self):
+        pass
+
+def configure_logging(verbose=False, quiet=False):
+    """
+    Sends `logger` output to stdout: DEBUG with --verbose, WARNING with --quiet, INFO otherwise.
+    Output is only flushed per message when stdout is an interactive terminal.
+    Characters the console can't encode are printed as '?' instead of failing the message.
+    """
+    if hasattr(sys.stdout, 'reconfigure'): # Not on replaced streams (e.g. under some IDEs)
+        sys.stdout.reconfigure(errors='replace')
+    if sys.stdout.isatty():
+        handler = logging.StreamHandler(sys.stdout)
+    else:
+        handler = BufferedStreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.propagate = False
+    if verbose:
+        logger.setLevel(logging.DEBUG)
+    elif quiet:
+        logger.setLevel(logging.WARNING)
+    else:
+        logger.setLevel(logging.INFO)
+
+# --- Persistent Hash Cache ---
+class HashCache:
+    """
+    Remembers content hashes across runs, so unchanged files are never hashed twice.
+    Entries are keyed by (st_dev, st_ino) and only used while the file's mtime, ctime and
+    size, and HASH_ALGO, are still the same (ctime also changes when a file is rewritten
+    and its mtime set back). SQLite connections can't be shared between threads, so a
+    cache must only be used by the thread that opened it.
+    New entries are buffered and written in one short transaction per WRITE_BATCH, so
+    another run using the same database never waits on a long-held write lock.
+    """
+    SCHEMA_VERSION = 2 # Stored as PRAGMA user_version; older tables are dropped
+    WRITE_BATCH = 500 # Entries written per transaction
+
+    def __init__(self, db_path):
+        self.connection = sqlite3.connect(db_path)
+        try:
+            with self.connection:
+                if self.connection.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                    self.connection.execute("DROP TABLE IF EXISTS hashes")
+                    self.connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+                self.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS hashes (dev INTEGER, ino INTEGER, mtime_ns INTEGER, ctime_ns INTEGER,"
+                    " size INTEGER, algo TEXT, digest BLOB, PRIMARY KEY (dev, ino))"
+                )
+        except sqlite3.Error:
+            self.connection.close()
+            raise
+        self.pending_rows = []
+
+    @classmethod
+    def open(cls):
+        """Opens the cache in the user's home directory; returns None if that isn't possible."""
+        db_path = os.path.join(os.path.expanduser("~"), HASH_CACHE_FILE_NAME)
+        try:
+            return cls(db_path)
+        except sqlite3.Error as e:
+            if VERBOSE_MODE:
+                logger.debug(f"Hash cache disabled, could not open {_safe(db_path)}: {e}")
+            return None
+
+    @staticmethod
+    def file_key(file_stat):
+        """Returns the cache key of a file from its os.stat_result, or None if it has no inode number."""
+        if not file_stat.st_ino:
+            return None
+        return file_stat.st_dev, file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_ctime_ns, file_stat.st_size
+
+    def get(self, key):
+        """Returns the cached digest for key, or None."""
+        try:
+            row = self.connection.execute(
+                "SELECT digest FROM hashes WHERE dev = ? AND ino = ? AND mtime_ns = ? AND ctime_ns = ? AND size = ? AND algo = ?",
+                (*key, HASH_ALGO)
+            ).fetchone()
+        except (sqlite3.Error, OverflowError): # OverflowError: values beyond SQLite's 64-bit integers
+            return None
+        return row[0] if row else None
+
+    def put(self, key, digest):
+        """Stores the digest for key; entries are written every WRITE_BATCH puts and on close."""
+        self.pending_rows.append((*key, HASH_ALGO, digest))
+        if len(self.pending_rows) >= self.WRITE_BATCH:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered entries in a single transaction."""
+        rows, self.pending_rows = self.pending_rows, []
+        try:
+            with self.connection: # Commits, or rolls back on error
+                self.connection.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        except (sqlite3.Error, OverflowError):
+            pass # Only a cache
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
 # --- Config Management Functions ---
 def get_config_file_path():
     """Returns the full path to the configuration file in the user's home directory."""
     return os.path.join(os.path.expanduser("~"), CONFIG_FILE_NAME)
 
+def _read_config():
+    """
+    Returns the saved settings as a dict (empty if there are none or they can't be read).
+    Falls back to the legacy INI file, so paths saved by older versions aren't lost.
+    """
+    config_file_path = get_config_file_path()
+    try:
+        with open(config_file_path, encoding='utf-8') as config_file:
+            config = json.load(config_file)
+        return config if isinstance(config, dict) else {}
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        if VERBOSE_MODE:
+            logger.debug(f"Error reading config file {_safe(config_file_path)}: {e}")
+        return {}
+
+    legacy_config_file_path = os.path.join(os.path.expanduser("~"), LEGACY_CONFIG_FILE_NAME)
+    if not os.path.exists(legacy_config_file_path):
+        return {}
+    import configparser # Only needed to migrate the old file
+    legacy_config = configparser.ConfigParser()
+    try:
+        legacy_config.read(legacy_config_file_path)
+        return dict(legacy_config[CONFIG_SECTION]) if CONFIG_SECTION in legacy_config else {}
+    except configparser.Error as e:
+        if VERBOSE_MODE:
+            logger.debug(f"Error reading config file {_safe(legacy_config_file_path)}: {e}")
+        return {}
+
 def load_last_paths():
     """Loads the last used source and destination paths from the config file."""
-    config = configparser.ConfigParser()
-    config_file_path = get_config_file_path()
+    config = _read_config()
+    source_path = config.get(CONFIG_SOURCE_KEY)
+    dest_path = config.get(CONFIG_DEST_KEY)
 
-    if os.path.exists(config_file_path):
-        try:
-            config.read(config_file_path)
-            source_path = config.get(CONFIG_SECTION, CONFIG_SOURCE_KEY, fallback=None)
-            dest_path = config.get(CONFIG_SECTION, CONFIG_DEST_KEY, fallback=None)
-
-            # Validate if paths still exist
-            if source_path and not os.path.isdir(source_path):
-                source_path = None
-            if dest_path and not os.path.isdir(dest_path):
-                dest_path = None
-
-            return source_path, dest_path
-        except configparser.Error as e:
-            if VERBOSE_MODE:
-                print(f"Error reading config file {config_file_path}: {e}")
-            return None, None
-    return None, None
+    # Validate if paths still exist
+    if not isinstance(source_path, str) or not os.path.isdir(source_path):
+        source_path = None
+    if not isinstance(dest_path, str) or not os.path.isdir(dest_path):
+        dest_path = None
+
+    return source_path, dest_path
 
 def save_last_paths(source_path, dest_path):
-    """Saves the last used source and destination paths to the config file."""
-    config = configparser.ConfigParser()
+    """
+    Saves the last used source and destination paths to the config file.
+    The file is written next to the old one and swapped in with os.replace, so an
+    interrupted save never leaves a truncated config behind.
+    """
     config_file_path = get_config_file_path()
 
-    # Read existing config to preserve other sections if any
-    if os.path.exists(config_file_path):
-        config.read(config_file_path)
-
-    if CONFIG_SECTION not in config:
-        config[CONFIG_SECTION] = {}
-
-    config[CONFIG_SECTION][CONFIG_SOURCE_KEY] = source_path
-    config[CONFIG_SECTION][CONFIG_DEST_KEY] = dest_path
+    # Read existing config to preserve other settings if any
+    config = _read_config()
+    config[CONFIG_SOURCE_KEY] = source_path
+    config[CONFIG_DEST_KEY] = dest_path
 
+    temp_file_path = f"{config_file_path}.tmp"
     try:
-        with open(config_file_path, 'w') as configfile:
-            config.write(configfile)
-        if VERBOSE_MODE:
-            print(f"Saved last paths to config: {source_path.encode('utf-8', errors='replace').decode('utf-8')}, {dest_path.encode('utf-8', errors='replace').decode('utf-8')}")
-    except IOError as e:
+        with open(temp_file_path, 'w', encoding='utf-8') as config_file:
+            json.dump(config, config_file, indent=2)
+        os.replace(temp_file_path, config_file_path)
         if VERBOSE_MODE:
-            print(f"Error writing config file {config_file_path}: {e}")
-    except Exception as e:
+            logger.debug(f"Saved last paths to config: {_safe(source_path)}, {_safe(dest_path)}")
+    except (OSError, ValueError) as e:
         if VERBOSE_MODE:
-            print(f"Unexpected error saving config file {config_file_path}: {e}")
+            logger.debug(f"Error writing config file {_safe(config_file_path)}: {e}")
+        try:
+            os.remove(temp_file_path)
+        except OSError:
+            pass
 
 # --- File Type Grouping ---
 
+def split_file_name(file_name):
+    """
+    Splits a bare file name (no directory part) into (file_name_proper, file_extension)
+    exactly like os.path.splitext, so leading dots don't start an extension (".bashrc"
+    has none), but without splitext's separator handling.
+    """
+    dot_index = file_name.rfind('.')
+    # Only an extension if something other than dots comes before the last dot
+    if dot_index > 0 and file_name.count('.', 0, dot_index) != dot_index:
+        return file_name[:dot_index], file_name[dot_index:]
+    return file_name, ''
+
 def get_categorized_paths(file_extension, file_name_proper):
     """
     Returns a tuple (top_level_folder_name, sub_folder_name) for a given file extension.
@@ -101,12 +379,12 @@ def get_categorized_paths(file_extension, file_name_proper):
     normalized_ext = file_extension.lower()
 
     if VERBOSE_MODE:
-        print(f"  Attempting to categorize extension: '{normalized_ext.encode('utf-8', errors='replace').decode('utf-8')}' (Original file_name_proper: '{file_name_proper.encode('utf-8', errors='replace').decode('utf-8')}')")
+        logger.debug(f"  Attempting to categorize extension: '{_safe(normalized_ext)}' (Original file_name_proper: '{_safe(file_name_proper)}')")
 
     # Case 1: No extension (e.g., "README", "my_script_without_ext")
     if not normalized_ext:
         if VERBOSE_MODE:
-            print(f"    -> No extension. Categorized as: {OTHER_FOLDER_NAME}/{NO_EXTENSION_FOLDER_NAME}")
+            logger.debug(f"    -> No extension. Categorized as: {OTHER_FOLDER_NAME}/{NO_EXTENSION_FOLDER_NAME}")
         return OTHER_FOLDER_NAME, NO_EXTENSION_FOLDER_NAME
 
     # Case 2: Hidden/config file (e.g., ".bashrc", ".profile")
@@ -115,133 +393,684 @@ def get_categorized_paths(file_extension, file_name_proper):
     # For "archive.tar.gz", os.path.splitext returns ('archive.tar', '.gz').
     if not file_name_proper and normalized_ext.startswith('.'):
         if VERBOSE_MODE:
-            print(f"    -> Hidden/config file. Categorized as: {OTHER_FOLDER_NAME}/{HIDDEN_OR_CONFIG_FOLDER_NAME}")
+            logger.debug(f"    -> Hidden/config file. Categorized as: {OTHER_FOLDER_NAME}/{HIDDEN_OR_CONFIG_FOLDER_NAME}")
         return OTHER_FOLDER_NAME, HIDDEN_OR_CONFIG_FOLDER_NAME
 
     # Case 3: Regular file with extension (e.g., "document.pdf", "image.jpg")
     # At this point, normalized_ext will be something like '.pdf', '.jpg', '.xlsx'
-    # We remove the leading dot for the sub_folder_name
-    ext_without_dot = normalized_ext[1:]
+    # and is looked up directly in the inverted group table.
+    # Case 4: Not in any known group, but has an extension (e.g., ".bak", ".xyz");
+    # the sub_folder_name is the extension without its leading dot.
+    categorized = _EXT_LOOKUP.get(normalized_ext)
+    if categorized is None:
+        categorized = (OTHER_FOLDER_NAME, normalized_ext[1:])
 
-    for group_name, extensions in FILE_TYPE_GROUPS.items():
-        if normalized_ext in extensions: # Check if the full .ext is in our list
-            if VERBOSE_MODE:
-                print(f"    -> Matched group '{group_name}'. Categorized as: {group_name}/{ext_without_dot}")
-            return group_name, ext_without_dot
-
-    # Case 4: Not in any known group, but has an extension (e.g., ".bak", ".xyz")
     if VERBOSE_MODE:
-        print(f"    -> No direct group match. Categorized as: {OTHER_FOLDER_NAME}/{ext_without_dot}")
-    return OTHER_FOLDER_NAME, ext_without_dot
+        if categorized[0] == OTHER_FOLDER_NAME:
+            logger.debug(f"    -> No direct group match. Categorized as: {categorized[0]}/{categorized[1]}")
+        else:
+            logger.debug(f"    -> Matched group '{categorized[0]}'. Categorized as: {categorized[0]}/{categorized[1]}")
+    return categorized
 
 # --- Helper Functions ---
 
-def calculate_file_hash(file_path, block_size=65536):
+def _advise_file_access(fd, advice):
+    """
+    Tells the kernel how a whole file will be used, e.g. 'POSIX_FADV_SEQUENTIAL' for more
+    read-ahead. A no-op where os.posix_fadvise isn't available (Windows, macOS).
+    """
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, 0, 0, getattr(os, advice))
+        except OSError:
+            pass # Only a hint
+
+def _new_hasher(file_size=None):
     """
-    Calculates the SHA256 hash of a file.
+    Returns a fresh hash object for HASH_ALGO.
+    Duplicate detection is not a security use, so usedforsecurity=False lets OpenSSL
+    pick its fastest implementation (e.g. SHA-NI accelerated SHA256).
+    BLAKE3 uses its own threads for files above BLAKE3_THREADED_MIN_SIZE (or of unknown size).
+    """
+    if HASH_ALGO == "blake3":
+        if file_size is None or file_size > BLAKE3_THREADED_MIN_SIZE:
+            return blake3.blake3(max_threads=blake3.blake3.AUTO)
+        return blake3.blake3()
+    if HASH_ALGO in XXHASH_ALGOS:
+        return getattr(xxhash, HASH_ALGO)()
+    return hashlib.new(HASH_ALGO, usedforsecurity=False)
+
+def hash_algo_error():
+    """Returns why HASH_ALGO can't be used for duplicate detection, or None if it can."""
+    if HASH_ALGO == "blake3" and blake3 is None:
+        return "Hash algorithm 'blake3' requires the blake3 package (pip install blake3)"
+    if HASH_ALGO in XXHASH_ALGOS and xxhash is None:
+        return f"Hash algorithm '{HASH_ALGO}' requires the xxhash package (pip install xxhash)"
+    try:
+        _new_hasher().digest() # Exactly what hashing every file will do
+    except ValueError:
+        return f"Unsupported hash algorithm '{HASH_ALGO}'"
+    except TypeError:
+        # e.g. shake_128: digest() needs a length
+        return f"Hash algorithm '{HASH_ALGO}' has a variable-length digest and can't be used; pick a fixed-length one such as sha256"
+    return None
+
+def calculate_file_hash(file_path, block_size=HASH_BLOCK_SIZE, file_size=None):
+    """
+    Calculates the content hash (HASH_ALGO) of a file.
     This is used to identify duplicate files based on their content.
+    Returns the raw digest bytes (half the size of a hex string as a dict key).
+    Files larger than MMAP_MIN_SIZE (or of unknown size) are memory-mapped and hashed
+    straight from the page cache, one update() call per MMAP_SLICE_SIZE slice; this
+    releases the GIL so several files can be hashed on separate threads.
+    Smaller files, and files that can't be mapped, use hashlib.file_digest (Python 3.11+)
+    or a readinto loop over a reused block_size buffer instead.
+    If file_size is known to be 0, the digest of no data is returned without opening the file.
     """
-    sha256 = hashlib.sha256()
     try:
-        with open(file_path, 'rb') as f:
-            for block in iter(lambda: f.read(block_size), b''):
-                sha256.update(block) # FIX: Changed sha256.update(sha256) to sha256.update(block)
-        return sha256.hexdigest()
+        if file_size == 0:
+            return _new_hasher().digest()
+        if HASH_ALGO == "blake3":
+            # Memory-maps the file and hashes it on multiple threads internally
+            hasher = _new_hasher(file_size)
+            hasher.update_mmap(file_path)
+            return hasher.digest()
+        # Unbuffered: mmap and file_digest both bypass Python's file buffer
+        with open(file_path, 'rb', buffering=0) as f:
+            _advise_file_access(f.fileno(), 'POSIX_FADV_SEQUENTIAL')
+            if file_size is None or file_size > MMAP_MIN_SIZE:
+                try:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        if hasattr(mm, 'madvise'): # Python 3.8+, not on Windows
+                            mm.madvise(mmap.MADV_SEQUENTIAL) # Aggressive read-ahead
+                        hasher = _new_hasher()
+                        with memoryview(mm) as view:
+                            for offset in range(0, len(mm), MMAP_SLICE_SIZE):
+                                hasher.update(view[offset:offset + MMAP_SLICE_SIZE])
+                                if len(mm) > MMAP_SLICE_SIZE and hasattr(mmap, 'MADV_DONTNEED'):
+                                    mm.madvise(mmap.MADV_DONTNEED, offset, min(MMAP_SLICE_SIZE, len(mm) - offset))
+                        return hasher.digest()
+                except (ValueError, OverflowError, OSError):
+                    # Empty files can't be mapped, and huge ones may not fit the address space
+                    pass
+            if sys.version_info >= (3, 11):
+                return hashlib.file_digest(f, _new_hasher).digest()
+            # One reusable buffer instead of a new bytes object per block
+            hasher = _new_hasher()
+            buffer = bytearray(block_size)
+            view = memoryview(buffer)
+            while True:
+                read = f.readinto(buffer)
+                if not read:
+                    break
+                hasher.update(view[:read])
+        return hasher.digest()
     except IOError:
         if VERBOSE_MODE:
-            print(f"Warning: Could not read file {file_path.encode('utf-8', errors='replace').decode('utf-8')} to calculate hash.")
+            logger.debug(f"Warning: Could not read file {_safe(file_path)} to calculate hash.")
         return None
     except Exception as e:
         if VERBOSE_MODE:
-            print(f"Error calculating hash for {file_path.encode('utf-8', errors='replace').decode('utf-8')}: {e}")
+            logger.debug(f"Error calculating hash for {_safe(file_path)}: {e}")
+        return None
+
+def calculate_quick_sketch(file_path, file_size):
+    """
+    Calculates a cheap hash of the first, middle and last SKETCH_BLOCK_SIZE bytes of a file.
+    Files of the same size whose sketches differ cannot be duplicates, so the full
+    content hash is only needed when sketches collide. The middle block tells apart
+    files that only share a header and trailer (e.g. media from the same encoder).
+    Each block is a single os.pread (positioned read, no seek) on a raw descriptor.
+    """
+    hasher = xxhash.xxh3_128() if xxhash else hashlib.blake2b(digest_size=16)
+    if file_size <= 3 * SKETCH_BLOCK_SIZE:
+        read_size = 3 * SKETCH_BLOCK_SIZE
+        offsets = (0,)
+    else:
+        read_size = SKETCH_BLOCK_SIZE
+        offsets = (0, (file_size - SKETCH_BLOCK_SIZE) // 2, file_size - SKETCH_BLOCK_SIZE)
+    try:
+        fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0)) # O_BINARY: Windows only
+        try:
+            for offset in offsets:
+                if hasattr(os, 'pread'):
+                    hasher.update(os.pread(fd, read_size, offset))
+                else: # Windows has no pread
+                    os.lseek(fd, offset, os.SEEK_SET)
+                    hasher.update(os.read(fd, read_size))
+        finally:
+            os.close(fd)
+        return hasher.digest()
+    except OSError:
+        if VERBOSE_MODE:
+            logger.debug(f"Warning: Could not read file {_safe(file_path)} to calculate its sketch.")
         return None
 
+def calculate_quick_sketches(files):
+    """Returns the quick sketch of each (path, size) pair in files, as a list in the same order."""
+    return [calculate_quick_sketch(file_path, file_size) for file_path, file_size in files]
+
+# Chunk size in which file data is read and handed to the archive's compressor
+TAR_COPY_BUFSIZE = 1024 * 1024
+
+# Archive formats for compressed output. Key: format name, Value: file extension.
+# Zstandard compresses on all cores and is the default when pyzstd is installed;
+# xz needs nothing beyond the standard library, and uses all cores too when the
+# xz command is installed (see XzProcessStream).
+COMPRESS_FORMATS = {"xz": ".tar.xz", "zstd": ".tar.zst"}
+DEFAULT_COMPRESS_FORMAT = "zstd" if pyzstd else "xz"
+ZSTD_LEVEL = 10
+XZ_PRESET = 6 # LZMA's own default; lower presets are several times faster
+# Valid --compress-level range per format. Key: format name, Value: (lowest, highest)
+COMPRESS_LEVELS = {"xz": (0, 9), "zstd": (1, 22)}
+
+# With parallel copies (--jobs), how many copies per thread may be queued ahead
+COPY_LOOKAHEAD = 4
+
+# Block size for copy_and_hash_file's single read loop
+COPY_AND_HASH_BLOCK_SIZE = 1024 * 1024
+
+# Possible duplicates at least this large are hashed while being copied (one read)
+# rather than hashed ahead and copied separately (two reads, the second rarely cached)
+FUSED_COPY_MIN_SIZE = 64 * 1024 * 1024
+
+# Directories already created (or found to exist) by create_directory_if_not_exists.
+# Like _copy_counters below, it only holds state for the current run: it is cleared
+# whenever organize_files_in_folder starts (the GUI can run several in one process).
+_created_dirs = set()
+
+# Next "_copy" counter to try, so name clashes don't re-probe every taken name.
+# Key: (destination folder, file name), Value: counter
+_copy_counters = {}
+
+def hash_files_ahead(executor, files, lookahead=HASH_LOOKAHEAD, hash_cache=None, file_stats=None):
+    """
+    Yields the content hash of each (file_path, file_size) pair in files, in order,
+    while keeping up to `lookahead` hashes running on `executor` ahead of the consumer.
+    This pipelines hashing with whatever the consumer does with each result.
+    With a HashCache, files it knows are not hashed again, and new hashes are stored in it;
+    file_stats (Key: path, Value: os.stat_result) provides the stats its keys are made of,
+    and files missing from it are simply not cached.
+    """
+    pending = deque() # (future or None, cache key or None, cached digest or None)
+
+    def next_result():
+        future, cache_key, file_hash = pending.popleft()
+        if future is not None:
+            file_hash = future.result()
+            if cache_key is not None and file_hash is not None:
+                hash_cache.put(cache_key, file_hash)
+        return file_hash
+
+    for file_path, file_size in files:
+        cache_key = None
+        cached_hash = None
+        file_stat = file_stats.get(file_path) if file_stats is not None else None
+        if hash_cache is not None and file_stat is not None and file_size != 0: # Empty files cost nothing to hash
+            cache_key = hash_cache.file_key(file_stat)
+            if cache_key is not None:
+                cached_hash = hash_cache.get(cache_key)
+        if cached_hash is not None:
+            pending.append((None, None, cached_hash))
+        else:
+            pending.append((executor.submit(calculate_file_hash, file_path, file_size=file_size), cache_key, None))
+        if len(pending) >= lookahead:
+            yield next_result()
+    while pending:
+        yield next_result()
+
 def create_directory_if_not_exists(dir_path, error_messages):
     """
     Creates a directory if it doesn't already exist.
+    Directories are remembered once ensured, so repeated calls for the same category
+    folder cost no syscalls at all.
     Records errors in the error_messages list.
     """
-    if not os.path.exists(dir_path):
+    if dir_path in _created_dirs:
+        return True
+    try:
+        os.makedirs(dir_path)
+        if VERBOSE_MODE:
+            logger.debug(f"Created directory: {_safe(dir_path)}")
+    except FileExistsError:
+        pass
+    except OSError as e:
+        error_messages.append(f"Error creating directory {_safe(dir_path)}: {e}")
+        return False
+    _created_dirs.add(dir_path)
+    return True
+
+def _copy_file_range(source_path, destination_path):
+    """
+    Copies a file's data with os.copy_file_range (Linux 4.5+, Python 3.8+).
+    The kernel copies without passing the data through user space, and on filesystems
+    supporting reflinks (btrfs, XFS, ...) it shares the data blocks instead of copying them.
+    Raises OSError if the kernel or filesystem can't do it (e.g. EXDEV across filesystems,
+    or no data copied at all, which some filesystems report instead of an error).
+    """
+    with open(source_path, 'rb', buffering=0) as fsrc, open(destination_path, 'wb', buffering=0) as fdst:
+        src_fd = fsrc.fileno()
+        dst_fd = fdst.fileno()
+        _advise_file_access(src_fd, 'POSIX_FADV_SEQUENTIAL')
+        size = remaining = os.fstat(src_fd).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(src_fd, dst_fd, remaining)
+            if not copied:
+                if remaining == size: # Unsupported here (e.g. some FUSE or overlay filesystems)
+                    raise OSError(f"copy_file_range copied no data from '{source_path}'")
+                break # File shrank while copying
+            remaining -= copied
+        # Copying is the last time the source is read
+        _advise_file_access(src_fd, 'POSIX_FADV_DONTNEED')
+
+def copy_file_fast(source_path, destination_path):
+    """
+    Copies a file's data and metadata like shutil.copy2, using the fastest method available.
+    On Windows with pywin32 installed this is CopyFile, which copies data, attributes and
+    timestamps in the OS itself. On Linux the data is copied (or reflinked) in the kernel
+    with copy_file_range. Otherwise (or if those fail) shutil.copy2 is used.
+    """
+    if win32file is not None:
         try:
-            os.makedirs(dir_path)
-            if VERBOSE_MODE:
-                print(f"Created directory: {dir_path.encode('utf-8', errors='replace').decode('utf-8')}")
+            win32file.CopyFile(source_path, destination_path, 0) # 0: overwrite existing destination
+            return
+        except Exception:
+            pass
+    if hasattr(os, 'copy_file_range'):
+        try:
+            _copy_file_range(source_path, destination_path)
+            shutil.copystat(source_path, destination_path)
+            return
+        except OSError:
+            pass # shutil.copy2 below overwrites whatever was written
+    shutil.copy2(source_path, destination_path)
+
+def copy_and_hash_file(source_path, destination_path, block_size=COPY_AND_HASH_BLOCK_SIZE):
+    """
+    Copies a file's data and metadata like shutil.copy2 while hashing the data read,
+    so the source is read only once for both. Returns the digest, as calculate_file_hash does.
+    """
+    buffer = bytearray(block_size)
+    view = memoryview(buffer)
+    with open(source_path, 'rb', buffering=0) as fsrc, open(destination_path, 'wb') as fdst:
+        _advise_file_access(fsrc.fileno(), 'POSIX_FADV_SEQUENTIAL')
+        hasher = _new_hasher(os.fstat(fsrc.fileno()).st_size)
+        while True:
+            read = fsrc.readinto(buffer)
+            if not read:
+                break
+            hasher.update(view[:read])
+            fdst.write(view[:read])
+        # The source has been read for the last time; drop it from the page cache
+        # rather than letting it push out data that is still to be read
+        _advise_file_access(fsrc.fileno(), 'POSIX_FADV_DONTNEED')
+    shutil.copystat(source_path, destination_path)
+    return hasher.digest()
+
+def reserve_destination_path(source_path, destination_path, file_name, error_messages):
+    """
+    Returns an unused path for file_name in destination_path, creating it as an empty file.
+    Handles potential overwrites by renaming if a file with the same name exists at the destination.
+    The destination name is reserved atomically with O_CREAT | O_EXCL, so there is one
+    syscall per candidate name and no race between checking a name and using it.
+    Probing resumes from the last counter used for the same name in the same folder.
+    Records errors in the error_messages list and returns None on failure.
+    """
+    final_destination_file_path = os.path.join(destination_path, file_name)
+    base_path, ext = os.path.splitext(final_destination_file_path)
+
+    # Keep trying new names until an unused one is found
+    counter_key = (destination_path, file_name)
+    for counter in itertools.count(_copy_counters.get(counter_key, 0)):
+        if counter:
+            final_destination_file_path = f"{base_path}_copy{counter}{ext}"
+        try:
+            fd = os.open(final_destination_file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            continue
         except OSError as e:
-            error_messages.append(f"Error creating directory {dir_path.encode('utf-8', errors='replace').decode('utf-8')}: {e}")
-            return False
-    return True
+            error_messages.append(f"Error copying file '{_safe(os.path.basename(source_path))}' to '{_safe(destination_path)}': {e}")
+            return None
+        os.close(fd)
+        _copy_counters[counter_key] = counter + 1
+        break
 
-def copy_file_with_feedback(source_path, destination_path, file_name, error_messages):
+    if counter and VERBOSE_MODE:
+        logger.debug(f"Warning: File '{_safe(file_name)}' already exists in '{_safe(destination_path)}'. Renaming to '{_safe(os.path.basename(final_destination_file_path))}'.")
+    return final_destination_file_path
+
+def release_destination_path(destination_path, file_name, final_destination_file_path):
+    """
+    Undoes reserve_destination_path after a failed copy or move: removes the placeholder
+    (or partial copy) and lets its name be handed out again.
+    """
+    try:
+        os.remove(final_destination_file_path)
+    except OSError:
+        pass
+    # Probing restarts from the plain name; failures are rare enough for that to be cheap
+    _copy_counters.pop((destination_path, file_name), None)
+
+def copy_file_with_feedback(source_path, destination_path, file_name, error_messages, hash_while_copying=False):
     """
     Copies a file and prints feedback.
-    Handles potential overwrites by renaming if a file with the same name exists at the destination.
-    Records errors in the error_messages list.
+    The destination name is chosen by reserve_destination_path, so existing files are never overwritten.
+    If hash_while_copying is True the file is copied with copy_and_hash_file and
+    (copied path, digest) is returned instead of just the copied path.
+    Records errors in the error_messages list; returns None (or (None, None)) on failure.
     """
-    # Construct the full path for the potential new file
-    potential_new_file_path = os.path.join(destination_path, file_name)
-    final_destination_file_path = potential_new_file_path
-
-    # Check if a file with the same name already exists in the destination
-    if os.path.exists(potential_new_file_path):
-        base, ext = os.path.splitext(file_name)
-        counter = 1
-        # Keep trying new names until an unused one is found
-        while os.path.exists(os.path.join(destination_path, f"{base}_copy{counter}{ext}")):
-            counter += 1
-        new_file_name = f"{base}_copy{counter}{ext}"
-        final_destination_file_path = os.path.join(destination_path, new_file_name)
-        if VERBOSE_MODE:
-            print(f"Warning: File '{file_name.encode('utf-8', errors='replace').decode('utf-8')}' already exists in '{destination_path.encode('utf-8', errors='replace').decode('utf-8')}'. Renaming to '{new_file_name.encode('utf-8', errors='replace').decode('utf-8')}'.")
+    final_destination_file_path = reserve_destination_path(source_path, destination_path, file_name, error_messages)
+    if final_destination_file_path is None:
+        return (None, None) if hash_while_copying else None
 
     try:
-        shutil.copy2(source_path, final_destination_file_path) # Use copy2 to preserve metadata
+        if hash_while_copying:
+            file_hash = copy_and_hash_file(source_path, final_destination_file_path)
+        else:
+            copy_file_fast(source_path, final_destination_file_path) # Preserves metadata like copy2
         if VERBOSE_MODE:
-            print(f"Copied: '{os.path.basename(source_path).encode('utf-8', errors='replace').decode('utf-8')}' from '{os.path.dirname(source_path).encode('utf-8', errors='replace').decode('utf-8')}' to '{destination_path.encode('utf-8', errors='replace').decode('utf-8')}' as '{os.path.basename(final_destination_file_path).encode('utf-8', errors='replace').decode('utf-8')}'")
+            logger.debug(f"Copied: '{_safe(os.path.basename(source_path))}' from '{_safe(os.path.dirname(source_path))}' to '{_safe(destination_path)}' as '{_safe(os.path.basename(final_destination_file_path))}'")
+        if hash_while_copying:
+            return final_destination_file_path, file_hash
         return final_destination_file_path # Return the actual path it was copied to
     except Exception as e:
-        error_messages.append(f"Error copying file '{os.path.basename(source_path).encode('utf-8', errors='replace').decode('utf-8')}' to '{destination_path.encode('utf-8', errors='replace').decode('utf-8')}': {e}")
+        error_messages.append(f"Error copying file '{_safe(os.path.basename(source_path))}' to '{_safe(destination_path)}': {e}")
+        release_destination_path(destination_path, file_name, final_destination_file_path)
+        return (None, None) if hash_while_copying else None
+
+def start_copy_with_feedback(copy_executor, source_path, destination_path, file_name, error_messages):
+    """
+    Like copy_file_with_feedback, but only reserves the destination name here (so names are
+    still handed out in processing order) and copies the data on copy_executor.
+    Returns (reserved path, future), to be passed to finish_copy_with_feedback, or (None, None).
+    """
+    final_destination_file_path = reserve_destination_path(source_path, destination_path, file_name, error_messages)
+    if final_destination_file_path is None:
+        return None, None
+    return final_destination_file_path, copy_executor.submit(copy_file_fast, source_path, final_destination_file_path)
+
+def finish_copy_with_feedback(source_path, destination_path, final_destination_file_path, copy_future, error_messages):
+    """
+    Waits for a copy started by start_copy_with_feedback. Returns True if it succeeded;
+    otherwise records the error in error_messages, releases the reserved name and returns False.
+    """
+    try:
+        copy_future.result()
+    except Exception as e:
+        error_messages.append(f"Error copying file '{_safe(os.path.basename(source_path))}' to '{_safe(destination_path)}': {e}")
+        # Parallel copies are always reserved under the source file's own name
+        release_destination_path(destination_path, os.path.basename(source_path), final_destination_file_path)
+        return False
+    if VERBOSE_MODE:
+        logger.debug(f"Copied: '{_safe(os.path.basename(source_path))}' from '{_safe(os.path.dirname(source_path))}' to '{_safe(destination_path)}' as '{_safe(os.path.basename(final_destination_file_path))}'")
+    return True
+
+def move_file_with_feedback(source_path, destination_path, file_name, error_messages):
+    """
+    Moves a file (within one filesystem) to destination_path under an unused name, like
+    copy_file_with_feedback, and returns its new path. Records errors in error_messages
+    and returns None on failure, leaving the file where it was.
+    """
+    final_destination_file_path = reserve_destination_path(source_path, destination_path, file_name, error_messages)
+    if final_destination_file_path is None:
+        return None
+    try:
+        os.replace(source_path, final_destination_file_path) # Replaces the empty placeholder
+        if VERBOSE_MODE:
+            logger.debug(f"Moved: '{_safe(os.path.basename(source_path))}' to '{_safe(destination_path)}' as '{_safe(os.path.basename(final_destination_file_path))}'")
+        return final_destination_file_path
+    except OSError as e:
+        error_messages.append(f"Error moving file '{_safe(os.path.basename(source_path))}' to '{_safe(destination_path)}': {e}")
+        release_destination_path(destination_path, file_name, final_destination_file_path)
         return None
 
 
 # --- Main Logic ---
 
-def count_files_in_folder(target_folder_path):
+class FileRecord(NamedTuple):
+    """A file collected for processing. Compact (tuple storage) and unpackable in loops."""
+    dirpath: str
+    name: str
+    path: str
+    size: Optional[int] # None if the file could not be stat'ed
+
+
+def _is_excluded_dir(entry, excluded_dir, excluded_name):
+    """True if the directory entry is excluded_dir itself (compared by identity, not by path string)."""
+    if entry.name != excluded_name: # The common case, decided without a syscall
+        return False
+    try:
+        return os.path.samefile(entry.path, excluded_dir)
+    except OSError:
+        return False
+
+def _scan_directory(dirpath, excluded_dir):
     """
-    Counts the total number of files in the target folder and its subdirectories.
-    Used for setting the maximum value of the progress bar.
+    Lists a single directory with os.scandir.
+    Returns (file_entries, sub_dir_paths); raises OSError if it can't be read.
     """
-    count = 0
-    # Collect all top-level group names for exclusion
-    top_level_group_names_for_counting_exclusion = list(FILE_TYPE_GROUPS.keys()) + [DUPLICATES_FOLDER_NAME, OTHER_FOLDER_NAME]
+    file_entries = []
+    sub_dirs = []
+    excluded_name = os.path.basename(excluded_dir) if excluded_dir else None
+    with os.scandir(dirpath) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if not _is_excluded_dir(entry, excluded_dir, excluded_name):
+                    sub_dirs.append(entry.path)
+            elif entry.is_file():
+                file_entries.append(entry)
+    return file_entries, sub_dirs
+
+def scan_folder(target_folder_path, excluded_dir=None):
+    """
+    Walks target_folder_path top-down like os.walk, yielding (dirpath, file_entries)
+    where file_entries is a list of os.DirEntry objects for the files in dirpath.
+    Uses os.scandir directly so the entry type (and, on Windows, its stat data) comes
+    from the directory read instead of extra stat() calls.
+    Directory symlinks are not followed, and excluded_dir (a directory path) is not
+    descended into, wherever it is reached from. Unreadable directories are skipped.
+    """
+    pending_dirs = [target_folder_path]
+    while pending_dirs:
+        dirpath = pending_dirs.pop()
+        try:
+            file_entries, sub_dirs = _scan_directory(dirpath, excluded_dir)
+        except OSError:
+            continue
+        yield dirpath, file_entries
+        # Reversed so sub-directories are visited in listing order, as with os.walk
+        pending_dirs.extend(reversed(sub_dirs))
+
+def _scan_subtree(dirpath, excluded_dir, prefetch_stat):
+    """Worker for scan_folder_parallel: walks one sub-tree completely."""
+    results = list(scan_folder(dirpath, excluded_dir))
+    if prefetch_stat:
+        for _, file_entries in results:
+            for entry in file_entries:
+                try:
+                    entry.stat() # Cached on the DirEntry for the caller
+                except OSError:
+                    pass # The caller's own stat() call will report it
+    return results
 
-    for dirpath, dirnames, filenames in os.walk(target_folder_path):
-        # Prune dirnames to avoid counting files in our own organizational folders
-        dirnames[:] = [d for d in dirnames if d not in top_level_group_names_for_counting_exclusion]
+def scan_folder_parallel(target_folder_path, excluded_dir=None, prefetch_stat=False, max_workers=SCAN_WORKERS):
+    """
+    Same as scan_folder, but every top-level sub-directory is walked on its own thread.
+    os.scandir and stat release the GIL, so on high-latency storage (network shares,
+    FUSE mounts) the metadata round trips of different sub-trees overlap.
+    With prefetch_stat the workers also stat every file, so entry.stat() is cached.
+    Results are yielded in exactly the same order as scan_folder.
+    """
+    try:
+        file_entries, sub_dirs = _scan_directory(target_folder_path, excluded_dir)
+    except OSError:
+        return
+    yield target_folder_path, file_entries
+    if not sub_dirs:
+        return
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_scan_subtree, sub_dir, excluded_dir, prefetch_stat) for sub_dir in sub_dirs]
+        for future in futures:
+            yield from future.result()
+
+
+class XzProcessStream:
+    """
+    Write-only file object compressing everything written to it into archive_path with
+    the external xz command. `xz -T0` compresses on all cores, where Python's lzma
+    module uses only one; the output is an ordinary .xz file.
+    """
+    def __init__(self, xz_path, archive_path, preset):
+        """Starts xz; raises OSError (leaving no file behind) if it can't be started."""
+        with open(archive_path, 'wb') as archive_file: # The child process keeps its own handle
+            try:
+                self.process = subprocess.Popen([xz_path, "-T0", f"-{preset}", "-c"],
+                                                stdin=subprocess.PIPE, stdout=archive_file)
+            except OSError:
+                archive_file.close()
+                os.remove(archive_path)
+                raise
+        self.closed = False
+
+    def write(self, data):
+        return self.process.stdin.write(data)
+
+    def close(self):
+        """Waits for xz to finish; raises OSError if it failed. Safe to call more than once."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass # xz already exited; its status says why
+        if self.process.wait() != 0:
+            raise OSError(f"xz exited with status {self.process.returncode}")
 
-        for item_name in filenames:
-            count += 1
-    return count
+def open_output_archive(archive_path, compress_format, compress_level=None):
+    """
+    Opens a tar archive for writing with the given compression (a COMPRESS_FORMATS key).
+    compress_level (see COMPRESS_LEVELS) trades speed for size; None uses ZSTD_LEVEL or XZ_PRESET.
+    Returns (tar, stream): stream is the compressed file object under the tar, which must be
+    closed after the tar itself, or None if closing the tar closes everything.
+    """
+    if compress_format == "zstd":
+        stream = pyzstd.ZstdFile(archive_path, 'wb', level_or_option={
+            pyzstd.CParameter.compressionLevel: ZSTD_LEVEL if compress_level is None else compress_level,
+            pyzstd.CParameter.nbWorkers: os.cpu_count() or 1,
+        })
+        try:
+            return tarfile.open(fileobj=stream, mode='w', copybufsize=TAR_COPY_BUFSIZE), stream
+        except Exception:
+            stream.close()
+            raise
+    preset = XZ_PRESET if compress_level is None else compress_level
+    stream = None
+    xz_path = shutil.which("xz")
+    if xz_path:
+        try:
+            stream = XzProcessStream(xz_path, archive_path, preset)
+        except OSError as e: # e.g. xz removed since shutil.which found it
+            if VERBOSE_MODE:
+                logger.debug(f"Could not start xz ({e}); compressing in-process instead.")
+    if stream:
+        try:
+            # Stream mode ('w|'): a pipe can't report its position like a file can
+            return tarfile.open(fileobj=stream, mode='w|', bufsize=TAR_COPY_BUFSIZE, copybufsize=TAR_COPY_BUFSIZE), stream
+        except Exception:
+            stream.close()
+            raise
+    # File data is fed to LZMA in TAR_COPY_BUFSIZE chunks instead of tarfile's default 16 KiB
+    return tarfile.open(archive_path, 'w:xz', copybufsize=TAR_COPY_BUFSIZE, preset=preset), None
+
+@functools.lru_cache(maxsize=None)
+def _owner_names(uid, gid):
+    """Returns (user name, group name) for archive members, as tarfile.gettarinfo would."""
+    user_name = group_name = ""
+    if pwd:
+        try:
+            user_name = pwd.getpwuid(uid).pw_name
+        except KeyError:
+            pass
+    if grp:
+        try:
+            group_name = grp.getgrgid(gid).gr_name
+        except KeyError:
+            pass
+    return user_name, group_name
 
+def add_file_to_archive(tar, file_path, arcname, is_plain_file=False):
+    """
+    Adds a file to tar under arcname.
+    For a plain file (regular, with a single link, as seen by the walk) the member header is
+    built from an fstat of the opened file and the file is streamed with tar.addfile, saving
+    the lstat and owner lookups tar.add does for every file. The header describes exactly
+    the file being read, even if it changed since the walk. Anything else (symlinks, hard
+    links tarfile may store as links, files that couldn't be stat'ed) goes through tar.add.
+    """
+    if not is_plain_file:
+        tar.add(file_path, arcname=arcname)
+        return
+    with open(file_path, 'rb') as f:
+        open_stat = os.fstat(f.fileno())
+        tarinfo = tarfile.TarInfo(arcname)
+        tarinfo.mode = stat.S_IMODE(open_stat.st_mode)
+        tarinfo.uid = open_stat.st_uid
+        tarinfo.gid = open_stat.st_gid
+        tarinfo.uname, tarinfo.gname = _owner_names(open_stat.st_uid, open_stat.st_gid)
+        tarinfo.size = open_stat.st_size
+        tarinfo.mtime = open_stat.st_mtime
+        tar.addfile(tarinfo, f)
+
+def files_are_identical(path_a, path_b):
+    """Compares two files byte by byte; a file that can't be read counts as different."""
+    try:
+        return filecmp.cmp(path_a, path_b, shallow=False)
+    except OSError:
+        return False
 
-def organize_files_in_folder(target_folder_path, destination_root_folder, compress_output_flag, progress_bar=None, status_label=None, total_files_to_process=0):
+def organize_files_in_folder(target_folder_path, destination_root_folder, compress_output_flag, progress_callback=None,
+                             compress_format=DEFAULT_COMPRESS_FORMAT, copy_jobs=1, verify_duplicates=False,
+                             compress_level=None, use_hash_cache=False):
     """
     Organizes files in the specified folder and its subfolders.
-    If compress_output_flag is True, files are added directly to a compressed archive.
+    If compress_output_flag is True, files are added directly to a compressed archive
+    (compress_format, a COMPRESS_FORMATS key, picks its compression and compress_level its level).
     Otherwise, files are COPIED to a new timestamped output folder.
-    Includes progress bar updates (if GUI elements are provided).
+    If progress_callback is given, it is called before each file is processed as
+    progress_callback(current_file_index, total_files_to_process, dirpath, item_name),
+    where total_files_to_process is the number of files found by the walk. While the
+    walk is still running it is called per directory with the number of files found
+    so far, total_files_to_process=None and item_name=None. Calls are throttled (see
+    PROGRESS_MIN_INTERVAL), so not every file or directory is reported.
+    The callback keeps the function itself free of any GUI dependency.
+    With copy_jobs > 1, uncompressed output is copied by that many threads in parallel.
+    With verify_duplicates, files whose hash matches an original are also compared with it
+    byte by byte before being treated as duplicates.
+    With use_hash_cache, full hashes are remembered across runs in HASH_CACHE_FILE_NAME
+    (see HashCache); otherwise nothing is written to the home directory for them.
     """
     error_messages = []
     processed_files_count = 0
     files_added_to_output = 0 # Renamed from copied_files_count for clarity with archiving
     duplicate_files_count = 0
+    # Folders and name counters of a previous run may have changed or gone since
+    _created_dirs.clear()
+    _copy_counters.clear()
 
     if not os.path.isdir(target_folder_path):
-        error_messages.append(f"The source path '{target_folder_path.encode('utf-8', errors='replace').decode('utf-8')}' is not a valid directory.")
+        error_messages.append(f"The source path '{_safe(target_folder_path)}' is not a valid directory.")
+        return processed_files_count, files_added_to_output, duplicate_files_count, error_messages, ""
+
+    # Checked before anything is created, rather than failing on every file (e.g. from the GUI)
+    hash_error = hash_algo_error()
+    if hash_error:
+        error_messages.append(f"{hash_error} (set via FILEORG_HASH).")
         return processed_files_count, files_added_to_output, duplicate_files_count, error_messages, ""
 
     if not os.path.isdir(destination_root_folder):
         if not create_directory_if_not_exists(destination_root_folder, error_messages):
-            error_messages.append(f"The destination path '{destination_root_folder.encode('utf-8', errors='replace').decode('utf-8')}' is not a valid directory and could not be created.")
+            error_messages.append(f"The destination path '{_safe(destination_root_folder)}' is not a valid directory and could not be created.")
             return processed_files_count, files_added_to_output, duplicate_files_count, error_messages, ""
 
     # --- Setup Output ---
@@ -252,15 +1081,16 @@ def organize_files_in_folder(target_folder_path, destination_root_folder, compre
     final_output_path = "" # Will be the path to the folder OR archive
 
     tar = None
+    archive_stream = None
     if compress_output_flag:
-        archive_name = f"file_organizer_{original_folder_name}_{timestamp}.tar.xz"
+        archive_name = f"file_organizer_{original_folder_name}_{timestamp}{COMPRESS_FORMATS[compress_format]}"
         final_output_path = os.path.join(destination_root_folder, archive_name)
         try:
-            tar = tarfile.open(final_output_path, 'w:xz') # Open for writing with XZ compression
+            tar, archive_stream = open_output_archive(final_output_path, compress_format, compress_level)
             if VERBOSE_MODE:
-                print(f"Opened archive for direct writing: {final_output_path.encode('utf-8', errors='replace').decode('utf-8')}")
+                logger.debug(f"Opened archive for direct writing: {_safe(final_output_path)}")
         except Exception as e:
-            error_messages.append(f"Error opening archive file '{final_output_path.encode('utf-8', errors='replace').decode('utf-8')}': {e}")
+            error_messages.append(f"Error opening archive file '{_safe(final_output_path)}': {e}")
             return processed_files_count, files_added_to_output, duplicate_files_count, error_messages, ""
     else:
         root_output_folder_name = f"file_organizer_{original_folder_name}_{timestamp}"
@@ -276,181 +1106,425 @@ def organize_files_in_folder(target_folder_path, destination_root_folder, compre
             return processed_files_count, files_added_to_output, duplicate_files_count, error_messages, ""
 
     # This dictionary will store file hashes to detect duplicates.
-    # Key: file_hash, Value: path of the first encountered (original) file (either disk path or archive internal path)
+    # Key: file_hash (raw digest bytes), Value: path of the first encountered (original) file (either disk path or archive internal path)
     known_file_hashes = {}
+    # Only with verify_duplicates: Key: file_hash, Value: source path of the original
+    original_sources = {}
 
-    # Set progress bar maximum if GUI elements are available
-    if progress_bar and status_label:
-        progress_bar['maximum'] = total_files_to_process
-        current_file_index = 0
+    def is_duplicate(item_path, file_hash):
+        """True if an original with file_hash was already output (and, if verifying, has the same bytes)."""
+        if file_hash is None or file_hash not in known_file_hashes:
+            return False
+        if not verify_duplicates or item_path in linked_to: # Links are the same file anyway
+            return True
+        if files_are_identical(item_path, original_sources[file_hash]):
+            return True
         if VERBOSE_MODE:
-            print(f"\nStarting recursive file organization from: {target_folder_path.encode('utf-8', errors='replace').decode('utf-8')}")
-            print(f"Output will be generated as: {final_output_path.encode('utf-8', errors='replace').decode('utf-8')}")
-            print("--------------------------------------------------")
-    elif VERBOSE_MODE:
-        print(f"\nStarting recursive file organization from: {target_folder_path.encode('utf-8', errors='replace').decode('utf-8')}")
-        print(f"Output will be generated as: {final_output_path.encode('utf-8', errors='replace').decode('utf-8')}")
-        print("--------------------------------------------------")
-
-    # --- Iterate through files in the target directory and its subdirectories ---
-    for dirpath, dirnames, filenames in os.walk(target_folder_path):
-        # Prune dirnames in-place to prevent os.walk from descending into
-        # our *own output* organizational folders if they happen to be inside the source tree.
-        # This is primarily relevant for uncompressed output.
-        if not compress_output_flag and root_output_folder_path: # Only relevant if uncompressed folder is created
-             dirnames[:] = [d for d in dirnames if d != os.path.basename(root_output_folder_path) and d != DUPLICATES_FOLDER_NAME]
+            logger.debug(f"  Same hash as '{_safe(original_sources[file_hash])}' but different contents; keeping it as an original.")
+        return False
 
+    current_file_index = 0
+    last_progress_time = 0.0
+    if VERBOSE_MODE:
+        logger.debug(f"\nStarting recursive file organization from: {_safe(target_folder_path)}")
+        logger.debug(f"Output will be generated as: {_safe(final_output_path)}")
+        logger.debug("--------------------------------------------------")
+
+    # --- Collect files and their sizes ---
+    # Duplicates always have the same size, so only files sharing their size with
+    # at least one other file can be duplicates.
+    files_to_process = [] # FileRecord for every file, in walk order
+    size_to_paths = {} # Key: file size in bytes, Value: list of paths with that size
+    paths_to_hash = set() # Paths that need a full content hash
+    # Hard links (and symlinks) to a file seen earlier in the walk are the very same
+    # file, so they are duplicates of it without reading either one.
+    first_path_by_inode = {} # Key: (st_dev, st_ino), Value: first path found for it
+    linked_to = {} # Key: path of a later link, Value: first path of the same file
+    # Compressed output only: plain files (regular, one link, not reached through a symlink),
+    # whose archive member headers add_file_to_archive can build itself
+    archive_plain_files = set()
+    # Hash cache only: stat of each file, which its cache key is made of
+    hash_cache_stats = {} # Key: path, Value: os.stat_result
+    # Don't descend into our *own output* folder if it happens to be inside the source
+    # tree (duplicates/ lives inside it). It is matched by identity, so user folders that
+    # merely share a name with a category or "duplicates" are still organized. Pruning
+    # the directory means no file from the output folder is ever yielded, so files need
+    # no per-path check.
+    excluded_dir = None
+    if not compress_output_flag and root_output_folder_path: # Only relevant if uncompressed folder is created
+        excluded_dir = root_output_folder_path
+
+    # The archive being written lies inside the source tree when the destination is the
+    # source (or one of its folders); it must not be added to itself. Only entries with
+    # its name are compared, so other files cost a string comparison, not a stat.
+    archive_name_in_walk = os.path.basename(final_output_path) if compress_output_flag else None
+
+    for dirpath, file_entries in scan_folder_parallel(target_folder_path, excluded_dir, prefetch_stat=True):
         if VERBOSE_MODE:
-            print(f"\nScanning directory: {dirpath.encode('utf-8', errors='replace').decode('utf-8')}")
-
-        for item_name in filenames:
-            item_path = os.path.join(dirpath, item_name)
-
-            # Update progress bar and status label if GUI elements are available
-            if progress_bar and status_label:
-                current_file_index += 1
-                percentage = (current_file_index / total_files_to_process) * 100
-                progress_bar['value'] = current_file_index
-                # Updated status label to show percentage and current folder/file
-                status_label.config(text=f"{percentage:.1f}% - Scanning: {os.path.basename(dirpath).encode('utf-8', errors='replace').decode('utf-8')} (File: {item_name.encode('utf-8', errors='replace').decode('utf-8')})")
-                progress_bar.master.update_idletasks()
-                progress_bar.master.update()
-
-            # If not compressing, skip files already in the output folder.
-            if not compress_output_flag and root_output_folder_path and item_path.startswith(root_output_folder_path):
-                if VERBOSE_MODE:
-                    print(f"Skipping file: '{item_name.encode('utf-8', errors='replace').decode('utf-8')}' (already in new output folder).")
+            logger.debug(f"\nScanning directory: {_safe(dirpath)}")
+        if progress_callback:
+            now = time.monotonic()
+            if now - last_progress_time >= PROGRESS_MIN_INTERVAL:
+                last_progress_time = now
+                progress_callback(len(files_to_process), None, dirpath, None) # Total not known yet
+
+        for entry in file_entries:
+            item_name = entry.name
+            item_path = entry.path
+            if item_name == archive_name_in_walk:
+                try:
+                    if os.path.samefile(item_path, final_output_path):
+                        continue # Our own output archive
+                except OSError:
+                    pass
+
+            try:
+                item_stat = entry.stat()
+            except OSError:
+                file_size = None
+                paths_to_hash.add(item_path) # Reported when hashing the file fails below
+            else:
+                file_size = item_stat.st_size
+                if use_hash_cache:
+                    hash_cache_stats[item_path] = item_stat
+                # Only files with several links (or reached through a symlink) can share
+                # an inode; st_ino is 0 where the platform doesn't report it
+                if item_stat.st_ino and (item_stat.st_nlink > 1 or entry.is_symlink()):
+                    first_path = first_path_by_inode.setdefault((item_stat.st_dev, item_stat.st_ino), item_path)
+                    if first_path != item_path:
+                        linked_to[item_path] = first_path
+                        paths_to_hash.add(first_path) # Its hash is reused for this link
+                        files_to_process.append(FileRecord(dirpath, item_name, item_path, file_size))
+                        continue
+                size_to_paths.setdefault(file_size, []).append(item_path)
+                if compress_output_flag and item_stat.st_nlink == 1 and stat.S_ISREG(item_stat.st_mode) and not entry.is_symlink():
+                    archive_plain_files.add(item_path)
+            files_to_process.append(FileRecord(dirpath, item_name, item_path, file_size))
+
+    # --- Sketch files whose size collides ---
+    # Most same-sized files already differ in their first or last block, so the full
+    # hash is only calculated for files whose size AND quick sketch collide.
+    # Sketch reads are small and scattered across many files, so a single thread leaves
+    # the disk waiting on one request at a time; batches of files are sketched on the
+    # hashing pool instead (os.pread releases the GIL), keeping HASH_WORKERS reads in flight.
+    hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS)
+    files_to_sketch = [] # (path, file size)
+    for file_size, paths in size_to_paths.items():
+        if len(paths) < 2:
+            continue
+        if file_size == 0:
+            paths_to_hash.update(paths) # Empty files are all identical; nothing to read
+            continue
+        files_to_sketch.extend((path, file_size) for path in paths)
+    sketch_batches = [files_to_sketch[start:start + SKETCH_BATCH_SIZE]
+                      for start in range(0, len(files_to_sketch), SKETCH_BATCH_SIZE)]
+    sketch_to_paths = {} # Key: (file size, sketch), Value: list of paths
+    for batch, sketches in zip(sketch_batches, hash_executor.map(calculate_quick_sketches, sketch_batches)):
+        for (path, file_size), sketch in zip(batch, sketches):
+            if sketch is None:
+                paths_to_hash.add(path) # Let the full hash report the read error
+            else:
+                sketch_to_paths.setdefault((file_size, sketch), []).append(path)
+    for paths in sketch_to_paths.values():
+        if len(paths) > 1:
+            paths_to_hash.update(paths)
+
+    # --- Hash the remaining candidates ahead of the processing loop ---
+    # Candidates are hashed on a thread pool (hashing releases the GIL) a bounded number
+    # of files ahead of the copy/archive loop below, so hashing overlaps with copying and
+    # a file is usually still in the page cache when it gets copied. Hashes are consumed
+    # in walk order, so the first copy of a file found is still the "original".
+    # Large candidates would have left the page cache again by the time they are copied,
+    # so when copying (not archiving) they are hashed while being copied instead, and
+    # moved to the duplicates folder afterwards if they turn out to be one.
+    fused_paths = set()
+    if not compress_output_flag:
+        fused_paths = {record.path for record in files_to_process
+                       if record.path in paths_to_hash and record.size is not None and record.size >= FUSED_COPY_MIN_SIZE}
+    candidates = [(record.path, record.size) for record in files_to_process
+                  if record.path in paths_to_hash and record.path not in fused_paths]
+    hash_cache = HashCache.open() if candidates and use_hash_cache else None
+    candidate_hashes = hash_files_ahead(hash_executor, candidates, hash_cache=hash_cache, file_stats=hash_cache_stats)
+    linked_first_paths = set(linked_to.values())
+    linked_hashes = {} # Key: first path of a linked file, Value: its hash
+
+    # --- Copy in parallel ---
+    # Destination names are still reserved here, in order; only the data copies run on
+    # the pool. A copy is counted (and its hash recorded) when it is started, and taken
+    # back if it later fails.
+    copy_executor = None
+    pending_copies = deque() # (source path, destination folder, reserved path, future, file hash, is duplicate)
+    if copy_jobs > 1 and not compress_output_flag:
+        copy_executor = ThreadPoolExecutor(max_workers=copy_jobs)
+
+    def finish_copies(max_pending):
+        nonlocal files_added_to_output, duplicate_files_count
+        while len(pending_copies) > max_pending:
+            source_path, destination_path, reserved_path, copy_future, copied_hash, is_duplicate = pending_copies.popleft()
+            if finish_copy_with_feedback(source_path, destination_path, reserved_path, copy_future, error_messages):
                 continue
+            if is_duplicate:
+                duplicate_files_count -= 1
+            else:
+                files_added_to_output -= 1
+                if copied_hash is not None and known_file_hashes.get(copied_hash) == reserved_path:
+                    del known_file_hashes[copied_hash] # Later copies of it become the original
+                error_messages.append(f"Failed to copy '{_safe(os.path.basename(source_path))}', it will not be recorded as an original for duplicate checking.")
+
+    # --- Process each collected file ---
+    # The walk above already materialized every file, so its length is the exact
+    # progress total: no separate counting pass over the tree is needed for it.
+    total_files_to_process = len(files_to_process)
+    progress_step = max(1, total_files_to_process // PROGRESS_STEPS)
+    last_progress_index = 0
+    # Bound to locals: this loop runs once per file, and local lookups are cheaper than
+    # resolving os.path.<name> through the module globals every time.
+    path_join = os.path.join
+    # Categories depend only on the extension once file_name_proper is known to be non-empty,
+    # which it always is after split_file_name. Key: file_extension, Value: (top level, sub folder)
+    categories_by_extension = {}
+    # Uncompressed output: category folders already created. Key: (top level, sub folder), Value: its path
+    category_folder_paths = {}
+    for dirpath, item_name, item_path, file_size in files_to_process:
+        current_file_index += 1
+        if progress_callback:
+            if current_file_index - last_progress_index >= progress_step or current_file_index == total_files_to_process:
+                report_progress = True
+            else:
+                report_progress = time.monotonic() - last_progress_time >= PROGRESS_MIN_INTERVAL
+            if report_progress:
+                last_progress_index = current_file_index
+                last_progress_time = time.monotonic()
+                progress_callback(current_file_index, total_files_to_process, dirpath, item_name)
 
-            processed_files_count += 1
-            if VERBOSE_MODE:
-                print(f"Processing file: {item_name.encode('utf-8', errors='replace').decode('utf-8')} (from {dirpath.encode('utf-8', errors='replace').decode('utf-8')})")
+        processed_files_count += 1
+        if VERBOSE_MODE:
+            logger.debug(f"Processing file: {_safe(item_name)} (from {_safe(dirpath)})")
 
-            file_hash = calculate_file_hash(item_path)
+        if item_path in linked_to:
+            # Same inode as a file processed earlier: reuse its hash instead of reading
+            file_hash = linked_hashes[linked_to[item_path]]
+            if VERBOSE_MODE:
+                logger.debug(f"  Same file (inode) as '{_safe(linked_to[item_path])}', reusing its hash.")
             if file_hash is None:
-                error_messages.append(f"Could not calculate hash for '{item_name.encode('utf-8', errors='replace').decode('utf-8')}' in '{dirpath.encode('utf-8', errors='replace').decode('utf-8')}'. Skipping.")
-                if VERBOSE_MODE:
-                    print(f"Skipping file {item_name.encode('utf-8', errors='replace').decode('utf-8')} due to hash calculation error.")
+                error_messages.append(f"Could not calculate hash for '{_safe(item_name)}' in '{_safe(dirpath)}'. Skipping.")
                 continue
-
-            # --- Handle Duplicates ---
-            if file_hash in known_file_hashes:
+        elif item_path in fused_paths:
+            file_hash = None # Calculated while copying, below
+            if item_path in linked_first_paths:
+                linked_hashes[item_path] = None # Until the copy succeeds
+        elif item_path not in paths_to_hash:
+            # No other file has this size and sketch, so it cannot be a duplicate
+            file_hash = None
+            if VERBOSE_MODE:
+                logger.debug(f"  Unique file size/sketch ({file_size} bytes), skipping hash calculation.")
+        else:
+            file_hash = next(candidate_hashes)
+            if item_path in linked_first_paths:
+                linked_hashes[item_path] = file_hash
+            if file_hash is None:
+                error_messages.append(f"Could not calculate hash for '{_safe(item_name)}' in '{_safe(dirpath)}'. Skipping.")
                 if VERBOSE_MODE:
-                    original_file_path = known_file_hashes[file_hash]
-                    print(f"Duplicate found: '{item_name.encode('utf-8', errors='replace').decode('utf-8')}' is a duplicate of '{os.path.basename(original_file_path).encode('utf-8', errors='replace').decode('utf-8')}'.")
-
-                if compress_output_flag:
-                    try:
-                        # Add duplicate to archive under a special duplicates path
-                        arcname_in_archive = os.path.join(DUPLICATES_FOLDER_NAME, item_name)
-                        if VERBOSE_MODE:
-                            print(f"  Adding duplicate to archive as: {arcname_in_archive.encode('utf-8', errors='replace').decode('utf-8')}")
-                        tar.add(item_path, arcname=arcname_in_archive) # Add directly by path, tarfile handles internal details
-                        duplicate_files_count += 1
-                    except Exception as e:
-                        error_messages.append(f"Error adding duplicate '{item_name.encode('utf-8', errors='replace').decode('utf-8')}' to archive: {e}")
-                else:
-                    if copy_file_with_feedback(item_path, duplicates_main_folder_path, item_name, error_messages):
-                        duplicate_files_count += 1
+                    logger.debug(f"Skipping file {_safe(item_name)} due to hash calculation error.")
                 continue
 
-            # --- Process Original File: Categorize and Copy/Add to Archive ---
-            file_name_proper, file_extension = os.path.splitext(item_name)
-
+        # --- Handle Duplicates ---
+        if file_hash is not None and is_duplicate(item_path, file_hash): # Most files have no hash to check
             if VERBOSE_MODE:
-                print(f"  Extracted file_name_proper: '{file_name_proper.encode('utf-8', errors='replace').decode('utf-8')}', file_extension: '{file_extension.encode('utf-8', errors='replace').decode('utf-8')}'")
-
-            top_level_folder_name, sub_folder_name = get_categorized_paths(file_extension, file_name_proper)
+                original_file_path = known_file_hashes[file_hash]
+                logger.debug(f"Duplicate found: '{_safe(item_name)}' is a duplicate of '{_safe(os.path.basename(original_file_path))}' (hash {file_hash.hex()}).")
 
             if compress_output_flag:
                 try:
-                    # Construct the path inside the archive
-                    arcname_in_archive = os.path.join(top_level_folder_name, sub_folder_name, item_name)
+                    # Add duplicate to archive under a special duplicates path
+                    arcname_in_archive = path_join(DUPLICATES_FOLDER_NAME, item_name)
                     if VERBOSE_MODE:
-                        print(f"  Adding original to archive as: {arcname_in_archive.encode('utf-8', errors='replace').decode('utf-8')}")
-                    tar.add(item_path, arcname=arcname_in_archive) # Add directly by path, tarfile handles internal details
-                    known_file_hashes[file_hash] = arcname_in_archive # Store archive internal path
-                    files_added_to_output += 1
+                        logger.debug(f"  Adding duplicate to archive as: {_safe(arcname_in_archive)}")
+                    add_file_to_archive(tar, item_path, arcname_in_archive, item_path in archive_plain_files)
+                    duplicate_files_count += 1
                 except Exception as e:
-                    error_messages.append(f"Error adding file '{item_name.encode('utf-8', errors='replace').decode('utf-8')}' to archive: {e}")
+                    error_messages.append(f"Error adding duplicate '{_safe(item_name)}' to archive: {e}")
+            elif copy_executor:
+                reserved_path, copy_future = start_copy_with_feedback(copy_executor, item_path, duplicates_main_folder_path, item_name, error_messages)
+                if reserved_path:
+                    pending_copies.append((item_path, duplicates_main_folder_path, reserved_path, copy_future, None, True))
+                    duplicate_files_count += 1
+                    finish_copies(COPY_LOOKAHEAD * copy_jobs)
             else:
-                # Normal uncompressed copy process
-                current_top_level_path = os.path.join(root_output_folder_path, top_level_folder_name)
+                if copy_file_with_feedback(item_path, duplicates_main_folder_path, item_name, error_messages):
+                    duplicate_files_count += 1
+            continue
+
+        if file_hash in known_file_hashes:
+            file_hash = None # Hash collision caught by verify_duplicates: don't replace the first original
+
+        # --- Process Original File: Categorize and Copy/Add to Archive ---
+        file_name_proper, file_extension = split_file_name(item_name)
+
+        if VERBOSE_MODE:
+            logger.debug(f"  Extracted file_name_proper: '{_safe(file_name_proper)}', file_extension: '{_safe(file_extension)}'")
+            categories = get_categorized_paths(file_extension, file_name_proper) # Logs how it was categorized
+        else:
+            categories = categories_by_extension.get(file_extension)
+            if categories is None:
+                categories = categories_by_extension[file_extension] = get_categorized_paths(file_extension, file_name_proper)
+        top_level_folder_name, sub_folder_name = categories
+
+        if compress_output_flag:
+            try:
+                # Construct the path inside the archive
+                arcname_in_archive = path_join(top_level_folder_name, sub_folder_name, item_name)
+                if VERBOSE_MODE:
+                    logger.debug(f"  Adding original to archive as: {_safe(arcname_in_archive)}")
+                add_file_to_archive(tar, item_path, arcname_in_archive, item_path in archive_plain_files)
+                if file_hash is not None:
+                    known_file_hashes[file_hash] = arcname_in_archive # Store archive internal path
+                    if verify_duplicates:
+                        original_sources[file_hash] = item_path
+                files_added_to_output += 1
+            except Exception as e:
+                error_messages.append(f"Error adding file '{_safe(item_name)}' to archive: {e}")
+        else:
+            # Normal uncompressed copy process
+            specific_type_folder_path = category_folder_paths.get(categories)
+            if specific_type_folder_path is None:
+                current_top_level_path = path_join(root_output_folder_path, top_level_folder_name)
                 if not create_directory_if_not_exists(current_top_level_path, error_messages):
-                    error_messages.append(f"Skipping file {item_name.encode('utf-8', errors='replace').decode('utf-8')} as its top-level category folder '{current_top_level_path.encode('utf-8', errors='replace').decode('utf-8')}' could not be created.")
+                    error_messages.append(f"Skipping file {_safe(item_name)} as its top-level category folder '{_safe(current_top_level_path)}' could not be created.")
                     continue
 
-                specific_type_folder_path = os.path.join(current_top_level_path, sub_folder_name)
+                specific_type_folder_path = path_join(current_top_level_path, sub_folder_name)
                 if not create_directory_if_not_exists(specific_type_folder_path, error_messages):
-                    error_messages.append(f"Skipping file {item_name.encode('utf-8', errors='replace').decode('utf-8')} as its sub-folder '{specific_type_folder_path.encode('utf-8', errors='replace').decode('utf-8')}' could not be created.")
+                    error_messages.append(f"Skipping file {_safe(item_name)} as its sub-folder '{_safe(specific_type_folder_path)}' could not be created.")
                     continue
-
+                category_folder_paths[categories] = specific_type_folder_path
+
+            if item_path in fused_paths:
+                copied_file_actual_path, file_hash = copy_file_with_feedback(
+                    item_path, specific_type_folder_path, item_name, error_messages, hash_while_copying=True
+                )
+                if item_path in linked_first_paths:
+                    linked_hashes[item_path] = file_hash
+                if copied_file_actual_path and is_duplicate(item_path, file_hash):
+                    # A duplicate after all: move the copy where duplicates belong
+                    if VERBOSE_MODE:
+                        logger.debug(f"Duplicate found while copying: '{_safe(item_name)}' is a duplicate of '{_safe(os.path.basename(known_file_hashes[file_hash]))}' (hash {file_hash.hex()}).")
+                    if move_file_with_feedback(copied_file_actual_path, duplicates_main_folder_path, item_name, error_messages):
+                        duplicate_files_count += 1
+                        # Its name in the category folder is free again: give it to the next
+                        # file with this name rather than moving on to the next "_copy" counter
+                        _copy_counters[(specific_type_folder_path, item_name)] -= 1
+                        continue
+                    # Not moved, so it stays in the category folder and counts as an original
+                    # there; the first original is still the one used for duplicate checks
+                    file_hash = None
+                elif file_hash in known_file_hashes:
+                    file_hash = None # Hash collision, see above
+            elif copy_executor:
+                copied_file_actual_path, copy_future = start_copy_with_feedback(copy_executor, item_path, specific_type_folder_path, item_name, error_messages)
+                if copied_file_actual_path:
+                    pending_copies.append((item_path, specific_type_folder_path, copied_file_actual_path, copy_future, file_hash, False))
+            else:
                 copied_file_actual_path = copy_file_with_feedback(item_path, specific_type_folder_path, item_name, error_messages)
 
-                if copied_file_actual_path:
+            if copied_file_actual_path:
+                if file_hash is not None:
                     known_file_hashes[file_hash] = copied_file_actual_path
-                    files_added_to_output += 1
-                else:
-                    error_messages.append(f"Failed to copy '{item_name.encode('utf-8', errors='replace').decode('utf-8')}', it will not be recorded as an original for duplicate checking.")
+                    if verify_duplicates:
+                        original_sources[file_hash] = item_path
+                files_added_to_output += 1
+            else:
+                error_messages.append(f"Failed to copy '{_safe(item_name)}', it will not be recorded as an original for duplicate checking.")
+            if copy_executor:
+                # Only once this copy is counted and its hash recorded, so a failure can take both back
+                finish_copies(COPY_LOOKAHEAD * copy_jobs)
+
+    if copy_executor:
+        finish_copies(0)
+        copy_executor.shutdown()
+    hash_executor.shutdown()
+    if hash_cache:
+        hash_cache.close()
 
     # Close the tarfile if it was opened
     if tar:
         try:
             tar.close()
+            if archive_stream:
+                archive_stream.close()
             if VERBOSE_MODE:
-                print(f"Archive closed: {final_output_path.encode('utf-8', errors='replace').decode('utf-8')}")
+                logger.debug(f"Archive closed: {_safe(final_output_path)}")
         except Exception as e:
-            error_messages.append(f"Error closing archive file '{final_output_path.encode('utf-8', errors='replace').decode('utf-8')}': {e}")
+            error_messages.append(f"Error closing archive file '{_safe(final_output_path)}': {e}")
+            if archive_stream:
+                try:
+                    archive_stream.close()
+                except Exception:
+                    pass # Removed below anyway
             if os.path.exists(final_output_path):
                 try:
                     os.remove(final_output_path)
-                    error_messages.append(f"Removed incomplete archive due to error: {final_output_path.encode('utf-8', errors='replace').decode('utf-8')}")
+                    error_messages.append(f"Removed incomplete archive due to error: {_safe(final_output_path)}")
                 except Exception as clean_e:
-                    error_messages.append(f"Failed to remove incomplete archive '{final_output_path.encode('utf-8', errors='replace').decode('utf-8')}': {clean_e}")
+                    error_messages.append(f"Failed to remove incomplete archive '{_safe(final_output_path)}': {clean_e}")
             final_output_path = ""
 
     if compress_output_flag and processed_files_count == 0 and final_output_path and os.path.exists(final_output_path):
         try:
             os.remove(final_output_path)
             if VERBOSE_MODE:
-                print(f"Removed empty archive as no files were processed: {final_output_path.encode('utf-8', errors='replace').decode('utf-8')}")
+                logger.debug(f"Removed empty archive as no files were processed: {_safe(final_output_path)}")
             final_output_path = ""
         except Exception as e:
-            error_messages.append(f"Failed to remove empty archive '{final_output_path.encode('utf-8', errors='replace').decode('utf-8')}': {e}")
+            error_messages.append(f"Failed to remove empty archive '{_safe(final_output_path)}': {e}")
+
+    if not compress_output_flag and processed_files_count == 0 and final_output_path:
+        # Nothing was found to copy, so don't leave an empty output folder behind
+        try:
+            os.rmdir(duplicates_main_folder_path)
+            os.rmdir(final_output_path)
+            _created_dirs.discard(duplicates_main_folder_path)
+            _created_dirs.discard(final_output_path)
+            if VERBOSE_MODE:
+                logger.debug(f"Removed empty output folder as no files were processed: {_safe(final_output_path)}")
+            final_output_path = ""
+        except OSError as e:
+            error_messages.append(f"Failed to remove empty output folder '{_safe(final_output_path)}': {e}")
 
     if VERBOSE_MODE:
-        print("\n--------------------------------------------------")
-        print("File organization process complete.")
+        logger.debug("\n--------------------------------------------------")
+        logger.debug("File organization process complete.")
 
     return processed_files_count, files_added_to_output, duplicate_files_count, error_messages, final_output_path
 
 # --- Custom Confirmation Dialog ---
-class CustomConfirmationDialog(tk.Toplevel):
+class CustomConfirmationDialog:
+    # Wraps a Toplevel instead of subclassing it, since tkinter is imported lazily
     def __init__(self, parent, source_folder_path, destination_folder_path):
-        super().__init__(parent)
+        self.window = tk.Toplevel(parent)
         self.parent = parent
-        self.transient(parent)
-        self.grab_set()
+        self.window.transient(parent)
+        self.window.grab_set()
         self.result = False
-        self.compress_output = tk.BooleanVar(self, value=False)
+        self.compress_output = tk.BooleanVar(self.window, value=False)
 
-        self.title("Confirm Organization")
-        self.resizable(False, True)
+        self.window.title("Confirm Organization")
+        self.window.resizable(False, True)
 
         style = ttk.Style()
         style.configure("TLabel", font=("Arial", 10), padding=5)
         style.configure("TButton", font=("Arial", 10, "bold"), padding=8)
         style.configure("Header.TLabel", font=("Arial", 12, "bold"))
 
-        content_frame = ttk.Frame(self, padding=15)
+        content_frame = ttk.Frame(self.window, padding=15)
         content_frame.pack(expand=True, fill="both")
 
         header_label = ttk.Label(content_frame, text="Confirm File Organization", style="Header.TLabel")
         header_label.pack(pady=(0, 10))
 
         message_text = f"Are you sure you want to organize files from:\n" \
-                       f"•  Source: {source_folder_path.encode('utf-8', errors='replace').decode('utf-8')}\n" \
-                       f"•  Destination: {destination_folder_path.encode('utf-8', errors='replace').decode('utf-8')}\n\n" \
+                       f"•  Source: {_safe(source_folder_path)}\n" \
+                       f"•  Destination: {_safe(destination_folder_path)}\n\n" \
                        f"This will recursively COPY files from the source folder and all its subfolders.\n" \
                        f"Files will be organized into main categories (e.g., 'images', 'documents') " \
                        f"with subfolders for specific extensions (e.g., 'images/jpg').\n" \
@@ -462,7 +1536,7 @@ class CustomConfirmationDialog(tk.Toplevel):
         message_label = ttk.Label(content_frame, text=message_text, wraplength=500, justify="left")
         message_label.pack(pady=(0, 20), fill="both", expand=True)
 
-        compress_checkbox = ttk.Checkbutton(content_frame, text="Output as compressed .tar.xz archive (saves disk space during process)", variable=self.compress_output)
+        compress_checkbox = ttk.Checkbutton(content_frame, text=f"Output as compressed {COMPRESS_FORMATS[DEFAULT_COMPRESS_FORMAT]} archive (saves disk space during process)", variable=self.compress_output)
         compress_checkbox.pack(pady=(5, 15), anchor="w")
 
         button_frame = ttk.Frame(content_frame)
@@ -474,34 +1548,34 @@ class CustomConfirmationDialog(tk.Toplevel):
         no_button = ttk.Button(button_frame, text="No, Cancel", command=self._on_no)
         no_button.pack(side="right", padx=10)
 
-        self.protocol("WM_DELETE_WINDOW", self._on_no)
+        self.window.protocol("WM_DELETE_WINDOW", self._on_no)
 
-        self.update_idletasks()
-        width = self.winfo_reqwidth()
-        height = self.winfo_reqheight()
+        self.window.update_idletasks()
+        width = self.window.winfo_reqwidth()
+        height = self.window.winfo_reqheight()
 
         width = max(width + 30, 550)
         height = max(height + 30, 350)
 
         x = self.parent.winfo_x() + (self.parent.winfo_width() // 2) - (width // 2)
         y = self.parent.winfo_y() + (self.parent.winfo_height() // 2) - (height // 2)
-        self.geometry(f"+{x}+{y}")
+        self.window.geometry(f"+{x}+{y}")
 
-        self.lift()
-        self.attributes('-topmost', True)
-        self.focus_force()
-        self.after_idle(self.attributes, '-topmost', False)
+        self.window.lift()
+        self.window.attributes('-topmost', True)
+        self.window.focus_force()
+        self.window.after_idle(self.window.attributes, '-topmost', False)
 
     def _on_yes(self):
         self.result = True
-        self.destroy()
+        self.window.destroy()
 
     def _on_no(self):
         self.result = False
-        self.destroy()
+        self.window.destroy()
 
     def show(self):
-        self.parent.wait_window(self)
+        self.parent.wait_window(self.window)
         return self.result, self.compress_output.get()
 
 
@@ -545,7 +1619,7 @@ class FileOrganizerApp:
         last_source_folder, last_destination_folder = load_last_paths()
 
         if VERBOSE_MODE:
-            print("Launching source folder selection dialog.")
+            logger.debug("Launching source folder selection dialog.")
 
         source_folder_selected = filedialog.askdirectory(
             parent=self.master, # Parent the dialog to the main window
@@ -558,7 +1632,7 @@ class FileOrganizerApp:
             return
 
         if VERBOSE_MODE:
-            print("Launching destination folder selection dialog.")
+            logger.debug("Launching destination folder selection dialog.")
 
         initial_dir_for_dest = last_destination_folder if last_destination_folder else os.path.dirname(source_folder_selected)
 
@@ -590,12 +1664,6 @@ class FileOrganizerApp:
         confirm, compress_checked = confirm_dialog.show()
 
         if confirm:
-            total_files = count_files_in_folder(source_folder_selected)
-            if total_files == 0:
-                messagebox.showinfo("No Files Found", "No files found in the selected source folder or its subfolders to organize.", parent=self.master)
-                save_last_paths(source_folder_selected, destination_folder_selected)
-                return
-
             progress_window = tk.Toplevel(self.master) # Parent the progress window to the main window
             progress_window.title("Organizing Files...")
             progress_window.geometry("550x100")
@@ -616,51 +1684,109 @@ class FileOrganizerApp:
             status_label = tk.Label(progress_window, text="Preparing...", pady=10)
             status_label.pack()
 
-            progress_bar = ttk.Progressbar(progress_window, orient="horizontal", length=500, mode="determinate")
+            # The total is only known once the walk is done, so the bar runs in
+            # indeterminate mode until then instead of counting the files up front.
+            progress_bar = ttk.Progressbar(progress_window, orient="horizontal", length=500, mode="indeterminate")
             progress_bar.pack(pady=5)
+            progress_bar.start(50)
 
-            # Run the organization in a way that allows GUI to update
-            # This is a simple approach; for very long operations, threading might be considered
-            # but it adds complexity. For file copying, it's usually acceptable.
-            processed, added_to_output, duplicates, errors, final_output_path = organize_files_in_folder(
-                source_folder_selected, destination_folder_selected, compress_checked, progress_bar, status_label, total_files
-            )
+            progress_window.grab_set() # Keep the main window inert while the worker runs
+
+            # organize_files_in_folder runs on a worker thread and only queues its progress;
+            # the Tk thread drains the queue on a timer, so Tk is never touched (or pumped)
+            # from the work loop and redraws at its own pace however fast files go by.
+            progress_queue = queue.Queue()
 
-            progress_window.destroy()
+            def queue_progress(current_file_index, total_files_to_process, dirpath, item_name):
+                progress_queue.put(("progress", (current_file_index, total_files_to_process, dirpath, item_name)))
 
-            save_last_paths(source_folder_selected, destination_folder_selected)
+            def run_organization():
+                try:
+                    result = organize_files_in_folder(
+                        source_folder_selected, destination_folder_selected, compress_checked, queue_progress
+                    )
+                except Exception as e: # Report instead of leaving the progress window up forever
+                    result = (0, 0, 0, [f"Unexpected error during organization: {e}"], "")
+                progress_queue.put(("done", result))
+
+            def poll_progress():
+                latest_progress = None
+                result = None
+                while True:
+                    try:
+                        kind, payload = progress_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if kind == "done":
+                        result = payload
+                    else:
+                        latest_progress = payload # Only the newest state is worth drawing
+
+                if latest_progress is not None:
+                    current_file_index, total_files_to_process, dirpath, item_name = latest_progress
+                    if total_files_to_process is None:
+                        status_label.config(text=f"Scanning: {_safe(os.path.basename(dirpath))} (Found: {current_file_index} files)")
+                    else:
+                        if progress_bar['mode'] != "determinate":
+                            progress_bar.stop()
+                            progress_bar.config(mode="determinate")
+                        percentage = (current_file_index / total_files_to_process) * 100
+                        progress_bar['maximum'] = total_files_to_process
+                        progress_bar['value'] = current_file_index
+                        # Show percentage and current folder/file
+                        status_label.config(text=f"{percentage:.1f}% - Scanning: {_safe(os.path.basename(dirpath))} (File: {_safe(item_name)})")
+
+                if result is None:
+                    self.master.after(PROGRESS_POLL_MS, poll_progress)
+                    return
+
+                progress_window.destroy()
+                save_last_paths(source_folder_selected, destination_folder_selected)
+                self.show_summary(source_folder_selected, destination_folder_selected, compress_checked, *result)
 
-            # --- Final Summary Message ---
-            summary_message = f"File organization process complete!\n\n" \
-                              f"Source folder: {source_folder_selected.encode('utf-8', errors='replace').decode('utf-8')}\n" \
-                              f"Destination folder: {destination_folder_selected.encode('utf-8', errors='replace').decode('utf-8')}\n"
+            threading.Thread(target=run_organization, daemon=True).start()
+            self.master.after(PROGRESS_POLL_MS, poll_progress)
 
-            if final_output_path:
-                if compress_checked:
-                    summary_message += f"Resulting archive: {final_output_path.encode('utf-8', errors='replace').decode('utf-8')}\n" \
-                                       f"(No temporary uncompressed folder created)\n\n"
-                else:
-                    summary_message += f"Resulting organized folder: {final_output_path.encode('utf-8', errors='replace').decode('utf-8')}\n\n"
-            else:
-                summary_message += "\nNo output file/folder was created (potentially due to errors or no files processed).\n\n"
+        else:
+            messagebox.showinfo("Cancelled", "File organization cancelled by user.", parent=self.master)
+
+    def show_summary(self, source_folder_selected, destination_folder_selected, compress_checked,
+                     processed, added_to_output, duplicates, errors, final_output_path):
+        if processed == 0 and not errors:
+            messagebox.showinfo("No Files Found", "No files found in the selected source folder or its subfolders to organize.", parent=self.master)
+            return
 
-            summary_message += f"Total files processed: {processed}\n" \
-                               f"Files copied/added to output: {added_to_output}\n" \
-                               f"Duplicate files copied/added: {duplicates}\n\n"
+        # --- Final Summary Message ---
+        # Collected as parts and joined once: with many errors, repeated += would copy
+        # the whole message again for every line
+        summary_parts = ["File organization process complete!\n\n",
+                         f"Source folder: {_safe(source_folder_selected)}\n",
+                         f"Destination folder: {_safe(destination_folder_selected)}\n"]
 
-            if errors:
-                summary_message += f"Errors encountered during process ({len(errors)}):\n"
-                for i, error in enumerate(errors):
-                    summary_message += f"- {error}\n"
-                messagebox.showerror("Organization Complete with Errors", summary_message, parent=self.master)
+        if final_output_path:
+            if compress_checked:
+                summary_parts.append(f"Resulting archive: {_safe(final_output_path)}\n"
+                                     f"(No temporary uncompressed folder created)\n\n")
             else:
-                message_title = "Organization Complete"
-                if processed == 0:
-                    message_title = "Organization Complete (No files processed)"
-                messagebox.showinfo(message_title, summary_message, parent=self.master)
+                summary_parts.append(f"Resulting organized folder: {_safe(final_output_path)}\n\n")
+        else:
+            summary_parts.append("\nNo output file/folder was created (potentially due to errors or no files processed).\n\n")
+
+        summary_parts.append(f"Total files processed: {processed}\n"
+                             f"Files copied/added to output: {added_to_output}\n"
+                             f"Duplicate files copied/added: {duplicates}\n\n")
 
+        if errors:
+            summary_parts.append(f"Errors encountered during process ({len(errors)}):\n")
+            summary_parts.extend(f"- {error}\n" for error in errors)
+            summary_message = "".join(summary_parts)
+            messagebox.showerror("Organization Complete with Errors", summary_message, parent=self.master)
         else:
-            messagebox.showinfo("Cancelled", "File organization cancelled by user.", parent=self.master)
+            summary_message = "".join(summary_parts)
+            message_title = "Organization Complete"
+            if processed == 0:
+                message_title = "Organization Complete (No files processed)"
+            messagebox.showinfo(message_title, summary_message, parent=self.master)
 
 # --- Main execution ---
 if __name__ == "__main__":
@@ -677,84 +1803,149 @@ if __name__ == "__main__":
     parser.add_argument(
         "--compress",
         action="store_true",
-        help="If specified, the organized output will be compressed into a .tar.xz archive directly, without creating an intermediate uncompressed folder."
+        help="If specified, the organized output will be compressed into a .tar.xz or .tar.zst archive directly, without creating an intermediate uncompressed folder."
+    )
+    parser.add_argument(
+        "--compress-format",
+        choices=sorted(COMPRESS_FORMATS),
+        default=DEFAULT_COMPRESS_FORMAT,
+        help=f"Compression used with --compress: 'zstd' (multi-threaded, needs pyzstd) or 'xz'. Defaults to '{DEFAULT_COMPRESS_FORMAT}'."
+    )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        help=f"Compression level with --compress: 0-9 for xz (default {XZ_PRESET}), 1-22 for zstd (default {ZSTD_LEVEL}). Lower is faster, higher is smaller."
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of files to copy in parallel (uncompressed output only). Helps most on network drives and Windows. Defaults to 1."
+    )
+    parser.add_argument(
+        "--verify-duplicates",
+        action="store_true",
+        help="Compare files byte by byte with their original before treating them as duplicates, instead of trusting the hash alone."
+    )
+    parser.add_argument(
+        "--hash-cache",
+        action="store_true",
+        help=f"Remember file hashes across runs in ~/{HASH_CACHE_FILE_NAME}, so unchanged possible duplicates aren't read again."
     )
     parser.add_argument(
         "--verbose",
         action="store_true",
         help="Enable verbose output to the terminal for debugging."
     )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Only print warnings and errors (no summary)."
+    )
     args = parser.parse_args()
 
     VERBOSE_MODE = args.verbose
+    configure_logging(verbose=args.verbose, quiet=args.quiet)
+
+    hash_error = hash_algo_error()
+    if hash_error:
+        logger.error(f"Error: {hash_error} (set via FILEORG_HASH).")
+        exit(1)
+    if args.compress_format == "zstd" and pyzstd is None:
+        logger.error("Error: --compress-format zstd requires the pyzstd package (pip install pyzstd).")
+        exit(1)
+    if args.compress_level is not None and not args.compress:
+        logger.error("Error: --compress-level only applies with --compress.")
+        exit(1)
+    if args.compress_level is not None:
+        lowest_level, highest_level = COMPRESS_LEVELS[args.compress_format]
+        if not lowest_level <= args.compress_level <= highest_level:
+            logger.error(f"Error: --compress-level for {args.compress_format} must be between {lowest_level} and {highest_level}.")
+            exit(1)
+    if args.jobs < 1:
+        logger.error("Error: --jobs must be at least 1.")
+        exit(1)
 
     if args.source_folder_path:
         # CLI mode
         source_folder_cli = args.source_folder_path
 
         if not os.path.isdir(source_folder_cli):
-            print(f"Error: Provided source path '{source_folder_cli.encode('utf-8', errors='replace').decode('utf-8')}' is not a valid directory.")
+            logger.error(f"Error: Provided source path '{_safe(source_folder_cli)}' is not a valid directory.")
             exit(1)
 
+        # Computed once and reused below. Also normalizes "folder/" and bare relative
+        # names, whose dirname/basename would otherwise be the folder itself or empty.
+        absolute_source_folder_cli = os.path.abspath(source_folder_cli)
+
         destination_folder_cli = args.destination
         if not destination_folder_cli:
-            destination_folder_cli = os.path.dirname(source_folder_cli)
+            destination_folder_cli = os.path.dirname(absolute_source_folder_cli)
             if VERBOSE_MODE:
-                print(f"No destination folder specified. Defaulting to parent of source: {destination_folder_cli.encode('utf-8', errors='replace').decode('utf-8')}")
+                logger.debug(f"No destination folder specified. Defaulting to parent of source: {_safe(destination_folder_cli)}")
 
         if not os.path.isdir(destination_folder_cli):
-            print(f"Error: Provided destination path '{destination_folder_cli.encode('utf-8', errors='replace').decode('utf-8')}' is not a valid directory and could not be created.")
+            logger.error(f"Error: Provided destination path '{_safe(destination_folder_cli)}' is not a valid directory and could not be created.")
             exit(1)
 
-        if os.path.abspath(source_folder_cli) == os.path.abspath(destination_folder_cli):
-            print(f"Warning: Source and destination folders are the same ('{os.path.abspath(source_folder_cli).encode('utf-8', errors='replace').decode('utf-8')}').")
+        if absolute_source_folder_cli == os.path.abspath(destination_folder_cli):
+            logger.warning(f"Warning: Source and destination folders are the same ('{_safe(absolute_source_folder_cli)}').")
             if args.compress:
-                print("The archive will be created directly in this folder.")
+                logger.warning("The archive will be created directly in this folder.")
             else:
-                print("A new timestamped organization folder will be created inside this directory.")
-
-        total_files = count_files_in_folder(source_folder_cli)
-        if total_files == 0:
-            print("No files found in the selected source folder or its subfolders to organize.")
-            save_last_paths(source_folder_cli, destination_folder_cli) # Save paths even if no files
-            exit(0)
+                logger.warning("A new timestamped organization folder will be created inside this directory.")
 
-        print("--- Starting File Organization (CLI Mode) ---")
+        logger.info("--- Starting File Organization (CLI Mode) ---")
         processed, added_to_output, duplicates, errors, final_output_path = organize_files_in_folder(
-            source_folder_cli, destination_folder_cli, args.compress, None, None, total_files
+            absolute_source_folder_cli, destination_folder_cli, args.compress, compress_format=args.compress_format,
+            copy_jobs=args.jobs, verify_duplicates=args.verify_duplicates, compress_level=args.compress_level,
+            use_hash_cache=args.hash_cache
         )
 
         save_last_paths(source_folder_cli, destination_folder_cli) # Save paths after operation
 
-        print(f"\n--- Organization Summary for {source_folder_cli.encode('utf-8', errors='replace').decode('utf-8')} ---")
-        print(f"Output intended for: {destination_folder_cli.encode('utf-8', errors='replace').decode('utf-8')}")
+        if processed == 0 and not errors:
+            logger.info("No files found in the selected source folder or its subfolders to organize.")
+            exit(0)
+
+        logger.info(f"\n--- Organization Summary for {_safe(source_folder_cli)} ---")
+        logger.info(f"Output intended for: {_safe(destination_folder_cli)}")
 
         if final_output_path:
             if args.compress:
-                print(f"Resulting archive: {final_output_path.encode('utf-8', errors='replace').decode('utf-8')}")
-                print("(No temporary uncompressed folder created)")
+                logger.info(f"Resulting archive: {_safe(final_output_path)}")
+                logger.info("(No temporary uncompressed folder created)")
             else:
-                print(f"Uncompressed organized output folder: {final_output_path.encode('utf-8', errors='replace').decode('utf-8')}")
+                logger.info(f"Uncompressed organized output folder: {_safe(final_output_path)}")
         else:
-            print("No organized output file/folder was created due to errors or no files processed.")
+            logger.info("No organized output file/folder was created due to errors or no files processed.")
 
-        print(f"Total files processed: {processed}")
-        print(f"Files copied/added to output: {added_to_output}")
-        print(f"Duplicate files copied/added: {duplicates}")
+        logger.info(f"Total files processed: {processed}")
+        logger.info(f"Files copied/added to output: {added_to_output}")
+        logger.info(f"Duplicate files copied/added: {duplicates}")
         if errors:
-            print("\nErrors encountered:")
-            for error in errors:
-                print(f"- {error}")
+            logger.error("\nErrors encountered:\n" + "\n".join(f"- {error}" for error in errors))
 
     else:
         # GUI mode
         # Check if a display is available before launching GUI
-        if 'DISPLAY' in os.environ or os.name == 'nt' or os.name == 'posix' and os.getenv('TERM_PROGRAM') == 'vscode':
-            root = tk.Tk()
+        try:
+            load_tkinter()
+        except ImportError:
+            print("Tkinter is not installed, so the GUI is unavailable (see README for how to install it).")
+            print("Usage: python script_name.py /path/to/your/source/folder [--destination /path/to/output] [--compress [--compress-format {xz,zstd}] [--compress-level N]] [--jobs N] [--verify-duplicates] [--hash-cache] [--verbose] [--quiet]")
+            exit(1)
+        root = None
+        if _HAS_DISPLAY:
+            try:
+                root = tk.Tk()
+            except tk.TclError as e: # e.g. DISPLAY is set but the display can't be reached
+                print(f"Could not open the GUI: {e}")
+        if root:
             app = FileOrganizerApp(root)
             root.mainloop()
         else:
             print("No source folder path provided and no GUI detected. Please run this script in an environment that supports Tkinter,")
             print("or provide the source folder path as a command-line argument:")
-            print("Usage: python script_name.py /path/to/your/source/folder [--destination /path/to/output] [--compress] [--verbose]")
+            print("Usage: python script_name.py /path/to/your/source/folder [--destination /path/to/output] [--compress [--compress-format {xz,zstd}] [--compress-level N]] [--jobs N] [--verify-duplicates] [--hash-cache] [--verbose] [--quiet]")
 
@@ -0,0 +1,317 @@
+import json
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import file_organizer
+
+
+def read_archive_names(archive_path):
+    if archive_path.endswith(".tar.zst"):
+        with file_organizer.pyzstd.ZstdFile(archive_path) as stream, tarfile.open(fileobj=stream, mode='r|') as tar:
+            return [member.name for member in tar]
+    with tarfile.open(archive_path) as tar:
+        return tar.getnames()
+
+
+class HashAlgoTest(unittest.TestCase):
+    """An unusable FILEORG_HASH is reported once, before any output is created."""
+
+    def test_unsupported_algorithm_is_an_error(self):
+        original_algo = file_organizer.HASH_ALGO
+        file_organizer.HASH_ALGO = "no-such-hash"
+        try:
+            with tempfile.TemporaryDirectory() as source_folder, tempfile.TemporaryDirectory() as destination_folder:
+                with open(os.path.join(source_folder, "a.txt"), "w") as f:
+                    f.write("one")
+
+                processed, added, duplicates, errors, output_path = file_organizer.organize_files_in_folder(
+                    source_folder, destination_folder, False
+                )
+
+                self.assertEqual((processed, added, duplicates, output_path), (0, 0, 0, ""))
+                self.assertEqual(len(errors), 1)
+                self.assertIn("no-such-hash", errors[0])
+                self.assertEqual(os.listdir(destination_folder), [])
+        finally:
+            file_organizer.HASH_ALGO = original_algo
+
+
+class CompressIntoSourceFolderTest(unittest.TestCase):
+    """With --compress and destination == source, the archive must not contain itself."""
+
+    def organize_into_source(self, compress_format):
+        with tempfile.TemporaryDirectory() as source_folder:
+            for name, content in (("a.txt", "first"), ("b.txt", "first"), ("c.jpg", "second")):
+                with open(os.path.join(source_folder, name), "w") as f:
+                    f.write(content)
+
+            processed, added, duplicates, errors, archive_path = file_organizer.organize_files_in_folder(
+                source_folder, source_folder, True, compress_format=compress_format, use_hash_cache=False
+            )
+
+            self.assertEqual(errors, [])
+            self.assertEqual((processed, added, duplicates), (3, 2, 1))
+            names = read_archive_names(archive_path)
+            self.assertEqual(len(names), 3)
+            self.assertNotIn(os.path.basename(archive_path), [os.path.basename(name) for name in names])
+
+    def test_xz(self):
+        self.organize_into_source("xz")
+
+    @unittest.skipIf(file_organizer.pyzstd is None, "pyzstd is not installed")
+    def test_zstd(self):
+        self.organize_into_source("zstd")
+
+
+class CopyIntoSourceFolderTest(unittest.TestCase):
+    """Without --compress and destination == source, only our own output folder is skipped."""
+
+    def test_user_folders_named_like_output_folders_are_organized(self):
+        with tempfile.TemporaryDirectory() as source_folder:
+            for folder, name, content in (("duplicates", "a.txt", "one"), ("images", "b.png", "two"), ("", "c.txt", "one")):
+                os.makedirs(os.path.join(source_folder, folder), exist_ok=True)
+                with open(os.path.join(source_folder, folder, name), "w") as f:
+                    f.write(content)
+
+            processed, added, duplicates, errors, output_folder = file_organizer.organize_files_in_folder(
+                source_folder, source_folder, False, use_hash_cache=False
+            )
+
+            self.assertEqual(errors, [])
+            self.assertEqual((processed, added, duplicates), (3, 2, 1))
+            # Files directly in the source come first in the walk, so c.txt is the original
+            self.assertEqual(os.listdir(os.path.join(output_folder, "documents", "txt")), ["c.txt"])
+            self.assertEqual(os.listdir(os.path.join(output_folder, "images", "png")), ["b.png"])
+            self.assertEqual(os.listdir(os.path.join(output_folder, file_organizer.DUPLICATES_FOLDER_NAME)), ["a.txt"])
+
+
+class LinkedFilesTest(unittest.TestCase):
+    """Hard links and symlinks to one file are duplicates of it, found without hashing it again."""
+
+    @unittest.skipUnless(hasattr(os, "link") and hasattr(os, "symlink"), "links are not supported")
+    def test_links_are_duplicates_of_the_first_path(self):
+        with tempfile.TemporaryDirectory() as source_folder, tempfile.TemporaryDirectory() as destination_folder:
+            original_path = os.path.join(source_folder, "a.txt")
+            with open(original_path, "w") as f:
+                f.write("linked")
+            os.link(original_path, os.path.join(source_folder, "b.txt"))
+            os.symlink(original_path, os.path.join(source_folder, "c.txt"))
+
+            with mock.patch.object(file_organizer, "calculate_file_hash", wraps=file_organizer.calculate_file_hash) as hash_mock:
+                processed, added, duplicates, errors, output_folder = file_organizer.organize_files_in_folder(
+                    source_folder, destination_folder, False, use_hash_cache=False
+                )
+
+            self.assertEqual(errors, [])
+            self.assertEqual((processed, added, duplicates), (3, 1, 2))
+            self.assertEqual(hash_mock.call_count, 1)
+            originals = os.listdir(os.path.join(output_folder, "documents", "txt"))
+            duplicate_names = os.listdir(os.path.join(output_folder, file_organizer.DUPLICATES_FOLDER_NAME))
+            self.assertEqual(len(originals), 1)
+            self.assertEqual(sorted(originals + duplicate_names), ["a.txt", "b.txt", "c.txt"])
+
+
+class FusedCopyTest(unittest.TestCase):
+    """Large duplicate candidates are hashed while copied, and moved if they turn out to be duplicates."""
+
+    def organize_big_files(self, source_folder, destination_folder):
+        # The walk lists a folder's files before its sub-folders', so the order is fixed
+        for folder, content in (("", "same"), ("d", "same"), (os.path.join("d", "e"), "different")):
+            os.makedirs(os.path.join(source_folder, folder), exist_ok=True)
+            with open(os.path.join(source_folder, folder, "big1.zip"), "w") as f:
+                f.write(content)
+        with mock.patch.object(file_organizer, "FUSED_COPY_MIN_SIZE", 1):
+            return file_organizer.organize_files_in_folder(source_folder, destination_folder, False, use_hash_cache=False)
+
+    def test_moved_duplicate_frees_its_copy_name(self):
+        with tempfile.TemporaryDirectory() as source_folder, tempfile.TemporaryDirectory() as destination_folder:
+            processed, added, duplicates, errors, output_folder = self.organize_big_files(source_folder, destination_folder)
+
+            self.assertEqual(errors, [])
+            self.assertEqual((processed, added, duplicates), (3, 2, 1))
+            category_folder = os.path.join(output_folder, "archives", "zip")
+            self.assertEqual(sorted(os.listdir(category_folder)), ["big1.zip", "big1_copy1.zip"])
+            with open(os.path.join(category_folder, "big1_copy1.zip")) as f:
+                self.assertEqual(f.read(), "different")
+            self.assertEqual(os.listdir(os.path.join(output_folder, file_organizer.DUPLICATES_FOLDER_NAME)), ["big1.zip"])
+
+    def test_duplicate_that_cannot_be_moved_counts_as_an_original(self):
+        with tempfile.TemporaryDirectory() as source_folder, tempfile.TemporaryDirectory() as destination_folder:
+            with mock.patch.object(file_organizer, "move_file_with_feedback", return_value=None):
+                processed, added, duplicates, errors, output_folder = self.organize_big_files(source_folder, destination_folder)
+
+            self.assertEqual((processed, added, duplicates), (3, 3, 0))
+            category_folder = os.path.join(output_folder, "archives", "zip")
+            self.assertEqual(sorted(os.listdir(category_folder)), ["big1.zip", "big1_copy1.zip", "big1_copy2.zip"])
+
+
+class HashCacheTest(unittest.TestCase):
+    """With use_hash_cache, unchanged files are not hashed again, and changed ones are."""
+
+    # Same size and same sketched blocks (first, middle and last), so only a full hash
+    # can tell files apart that differ in the byte between them
+    CONTENT = b"a" * 5000 + b"%s" + b"z" * 20000
+
+    def setUp(self):
+        home_folder = tempfile.TemporaryDirectory()
+        self.addCleanup(home_folder.cleanup)
+        home_patch = mock.patch.dict(os.environ, {"HOME": home_folder.name, "USERPROFILE": home_folder.name})
+        home_patch.start()
+        self.addCleanup(home_patch.stop)
+        self.cache_path = os.path.join(home_folder.name, file_organizer.HASH_CACHE_FILE_NAME)
+        self.source_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source_folder)
+        for name, middle in (("a.bin", b"1"), ("b.bin", b"1")):
+            with open(os.path.join(self.source_folder, name), "wb") as f:
+                f.write(self.CONTENT % middle)
+
+    def organize(self):
+        with tempfile.TemporaryDirectory() as destination_folder, \
+                mock.patch.object(file_organizer, "calculate_file_hash", wraps=file_organizer.calculate_file_hash) as hash_mock:
+            processed, added, duplicates, errors, _ = file_organizer.organize_files_in_folder(
+                self.source_folder, destination_folder, False, use_hash_cache=True
+            )
+        self.assertEqual(errors, [])
+        return (processed, added, duplicates), hash_mock.call_count
+
+    def test_unchanged_files_are_not_hashed_again(self):
+        self.assertEqual(self.organize(), ((2, 1, 1), 2))
+        self.assertTrue(os.path.exists(self.cache_path))
+        self.assertEqual(self.organize(), ((2, 1, 1), 0))
+
+    def test_rewritten_file_is_hashed_again(self):
+        self.organize()
+        time.sleep(0.1) # Let the clock behind ctime move on
+        changed_path = os.path.join(self.source_folder, "b.bin")
+        old_stat = os.stat(changed_path)
+        with open(changed_path, "r+b") as f:
+            f.write(self.CONTENT % b"2")
+        os.utime(changed_path, ns=(old_stat.st_atime_ns, old_stat.st_mtime_ns)) # Same size and mtime as before
+
+        self.assertEqual(self.organize(), ((2, 2, 0), 1))
+
+    def test_disabled_by_default(self):
+        with tempfile.TemporaryDirectory() as destination_folder:
+            file_organizer.organize_files_in_folder(self.source_folder, destination_folder, False)
+        self.assertFalse(os.path.exists(self.cache_path))
+
+
+class ParallelCopyRollbackTest(unittest.TestCase):
+    """With copy_jobs > 1, a copy that fails after it was counted is taken back."""
+
+    def test_failed_copy_is_taken_back(self):
+        with tempfile.TemporaryDirectory() as source_folder, tempfile.TemporaryDirectory() as destination_folder:
+            failing_path = os.path.join(source_folder, "x.txt")
+            os.makedirs(os.path.join(source_folder, "d"))
+            for path in (failing_path, os.path.join(source_folder, "d", "x.txt")):
+                with open(path, "w") as f:
+                    f.write("same")
+            real_copy = file_organizer.copy_file_fast
+
+            def copy_file_fast(source_path, destination_path):
+                if source_path == failing_path:
+                    raise OSError("injected failure")
+                real_copy(source_path, destination_path)
+
+            # No lookahead: each copy is finished before the next file is processed
+            with mock.patch.object(file_organizer, "copy_file_fast", copy_file_fast), \
+                    mock.patch.object(file_organizer, "COPY_LOOKAHEAD", 0):
+                processed, added, duplicates, errors, output_folder = file_organizer.organize_files_in_folder(
+                    source_folder, destination_folder, False, copy_jobs=2, use_hash_cache=False
+                )
+
+            self.assertEqual(len(errors), 2) # The copy error and the note that it isn't an original
+            # The files directly in the source come first, so the failed copy had been counted as
+            # the original; d/x.txt then takes its place and its reserved name
+            self.assertEqual((processed, added, duplicates), (2, 1, 0))
+            self.assertEqual(os.listdir(os.path.join(output_folder, "documents", "txt")), ["x.txt"])
+            self.assertEqual(os.listdir(os.path.join(output_folder, file_organizer.DUPLICATES_FOLDER_NAME)), [])
+
+
+class ArchiveChangedFileTest(unittest.TestCase):
+    """A file that changes between the walk and archiving is stored as it is when read."""
+
+    def test_member_size_follows_the_open_file(self):
+        new_contents = {"grow.txt": "grown since the walk", "shrink.txt": "shrunk"}
+        with tempfile.TemporaryDirectory() as source_folder, tempfile.TemporaryDirectory() as destination_folder:
+            for name, content in (("grow.txt", "short"), ("shrink.txt", "rather long content")):
+                with open(os.path.join(source_folder, name), "w") as f:
+                    f.write(content)
+
+            def rewrite_before_archiving(current_file_index, total_files_to_process, dirpath, item_name):
+                if item_name in new_contents: # Called just before the file is added
+                    with open(os.path.join(dirpath, item_name), "w") as f:
+                        f.write(new_contents[item_name])
+
+            processed, added, duplicates, errors, archive_path = file_organizer.organize_files_in_folder(
+                source_folder, destination_folder, True, progress_callback=rewrite_before_archiving,
+                compress_format="xz", use_hash_cache=False
+            )
+
+            self.assertEqual(errors, [])
+            self.assertEqual((processed, added, duplicates), (2, 2, 0))
+            with tarfile.open(archive_path) as tar:
+                archived = {os.path.basename(member.name): tar.extractfile(member).read().decode() for member in tar}
+            self.assertEqual(archived, new_contents)
+
+
+class ConfigTest(unittest.TestCase):
+    """The last folders are saved as JSON, and read once from the legacy INI file."""
+
+    def setUp(self):
+        self.home_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.home_folder)
+        home_patch = mock.patch.dict(os.environ, {"HOME": self.home_folder, "USERPROFILE": self.home_folder})
+        home_patch.start()
+        self.addCleanup(home_patch.stop)
+        self.config_path = os.path.join(self.home_folder, file_organizer.CONFIG_FILE_NAME)
+        self.source_folder = os.path.join(self.home_folder, "source")
+        self.destination_folder = os.path.join(self.home_folder, "destination")
+        os.mkdir(self.source_folder)
+        os.mkdir(self.destination_folder)
+
+    def test_saved_paths_are_loaded(self):
+        file_organizer.save_last_paths(self.source_folder, self.destination_folder)
+
+        with open(self.config_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {
+                file_organizer.CONFIG_SOURCE_KEY: self.source_folder,
+                file_organizer.CONFIG_DEST_KEY: self.destination_folder,
+            })
+        self.assertEqual(file_organizer.load_last_paths(), (self.source_folder, self.destination_folder))
+
+    def test_legacy_ini_is_migrated(self):
+        with open(os.path.join(self.home_folder, file_organizer.LEGACY_CONFIG_FILE_NAME), "w") as f:
+            f.write(f"[{file_organizer.CONFIG_SECTION}]\n"
+                    f"{file_organizer.CONFIG_SOURCE_KEY} = {self.source_folder}\n"
+                    f"{file_organizer.CONFIG_DEST_KEY} = {self.destination_folder}\n"
+                    "other_setting = kept\n")
+
+        self.assertEqual(file_organizer.load_last_paths(), (self.source_folder, self.destination_folder))
+        file_organizer.save_last_paths(self.destination_folder, self.source_folder)
+
+        with open(self.config_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {
+                file_organizer.CONFIG_SOURCE_KEY: self.destination_folder,
+                file_organizer.CONFIG_DEST_KEY: self.source_folder,
+                "other_setting": "kept",
+            })
+
+    def test_failed_save_leaves_no_temp_file(self):
+        os.mkdir(self.config_path) # os.replace can't put a file in its place
+
+        file_organizer.save_last_paths(self.source_folder, self.destination_folder)
+
+        self.assertEqual(sorted(os.listdir(self.home_folder)), sorted(["destination", "source", file_organizer.CONFIG_FILE_NAME]))
+
+
+if __name__ == "__main__":
+    unittest.main()